@@ -0,0 +1,62 @@
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+import tana2tree as t2t
+from tana2tree.generator import write_report
+from common import MANY_FEATURES as FEATURES
+
+# p99 loop lag allowed while reports load off the loop
+MAX_LAG = 0.05
+
+async def measure_lag(stop, lags, interval=0.001):
+    # how late the loop wakes a sleeping task
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append(time.perf_counter() - start - interval)
+
+async def load(mode, paths, concurrency):
+    if mode == "blocking":
+        for path in paths:
+            parser = t2t.Tanagra_Parser()
+            parser.parse(path)
+            await asyncio.sleep(0)
+        return
+    if mode == "thread":
+        parsers = await t2t.aparse_many(paths, concurrency)
+    else:
+        with ProcessPoolExecutor() as executor:
+            parsers = await t2t.aparse_many(paths, concurrency, executor)
+    assert len(parsers) == len(paths)
+
+async def run(mode, paths, concurrency):
+    stop, lags = asyncio.Event(), []
+    ticker = asyncio.ensure_future(measure_lag(stop, lags))
+    start = time.perf_counter()
+    await load(mode, paths, concurrency)
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await ticker
+    lags.sort()
+    return elapsed, lags[len(lags) // 2], lags[int(len(lags) * 0.99)], lags[-1]
+
+def main(n_reports=100, n_leaves=2000, concurrency=8):
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = []
+        for i in range(n_reports):
+            paths.append(os.path.join(tmp, "report{0:03}.txt".format(i)))
+            write_report(paths[-1], n_leaves, attributes=FEATURES, seed=i)
+
+        print("{0} reports of {1} leaves, concurrency {2}, cpus {3}".format(n_reports, n_leaves, concurrency, os.cpu_count()))
+        print("{0:>10} {1:>10} {2:>14} {3:>14} {4:>14}".format("mode", "time (s)", "p50 lag (ms)", "p99 lag (ms)", "max lag (ms)"))
+        for mode in ("blocking", "thread", "process"):
+            elapsed, p50, p99, worst = asyncio.run(run(mode, paths, concurrency))
+            print("{0:>10} {1:>10.2f} {2:>14.2f} {3:>14.2f} {4:>14.2f}".format(
+                mode, elapsed, p50 * 1000, p99 * 1000, worst * 1000))
+            assert mode == "blocking" or p99 < MAX_LAG, "{0} loads stall the loop".format(mode)
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100)
@@ -0,0 +1,60 @@
+import json
+import os
+import sys
+import tempfile
+import time
+import tana2tree as t2t
+from tana2tree.generator import write_report
+from common import MANY_FEATURES as FEATURES
+
+def timed(fn):
+    start = time.perf_counter()
+    out = fn()
+    return time.perf_counter() - start, out
+
+def main(sizes=(1000, 10000, 50000)):
+    print("{0:>8} {1:>10} {2:>12} {3:>12} {4:>12} {5:>12} {6:>12}".format(
+        "leaves", "format", "size (KB)", "write (ms)", "load (ms)", "lookup (ms)", "walk (ms)"))
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in sizes:
+            report = os.path.join(tmp, "report.txt")
+            write_report(report, n, attributes=FEATURES, seed=n)
+            parser = t2t.Tanagra_Parser()
+            parser.parse(report)
+            expected = parser.make_dict()
+            last = parser.traverse()[-1].attr
+
+            # json of make_dict, rebuilt with from_dict
+            json_file = os.path.join(tmp, "tree.json")
+            def write_json():
+                with open(json_file, "w") as file_out:
+                    json.dump(parser.make_dict(), file_out)
+            def load_json():
+                with open(json_file) as file_in:
+                    loaded = t2t.Tanagra_Parser()
+                    loaded.from_dict(json.load(file_in))
+                    return loaded
+
+            binary_file = os.path.join(tmp, "tree.t2tb")
+            def load_binary():
+                loaded = t2t.Tanagra_Parser()
+                loaded.load(binary_file)
+                return loaded
+
+            sizes = {}
+            for name, file_name, write, load in (("json", json_file, write_json, load_json),
+                                                 ("binary", binary_file, lambda: parser.save(binary_file), load_binary)):
+                write_seconds, _ = timed(write)
+                load_seconds, loaded = timed(load)
+                lookup_seconds, _ = timed(lambda: loaded.get_node(last))
+                walk_seconds, _ = timed(loaded.traverse)
+                assert loaded.make_dict() == expected
+                sizes[name] = os.path.getsize(file_name)
+                loaded.close()
+                print("{0:>8} {1:>10} {2:>12,.0f} {3:>12.1f} {4:>12.2f} {5:>12.2f} {6:>12.1f}".format(
+                    n, name, os.path.getsize(file_name) / 1024, write_seconds * 1000, load_seconds * 1000,
+                    lookup_seconds * 1000, walk_seconds * 1000))
+            assert sizes["binary"] < sizes["json"]
+
+if __name__ == '__main__':
+    main(tuple(int(a) for a in sys.argv[1:]) or (1000, 10000, 50000))
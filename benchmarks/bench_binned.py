@@ -0,0 +1,43 @@
+import os
+import sys
+import tempfile
+import time
+import numpy as np
+import tana2tree as t2t
+from tana2tree.generator import write_report
+from common import FEATURES
+
+def rate(tree, X):
+    tree.apply(X[:1000])
+    start = time.perf_counter()
+    leaves = tree.apply(X)
+    return X.shape[0] / (time.perf_counter() - start), leaves
+
+def main(n_rows=500000, cases=((2, 15), (3, 63), (4, 63), (4, 255), (8, 255), (30, 1023))):
+    rng = np.random.default_rng(0)
+    print("{0:>8} {1:>8} {2:>9} {3:>8} {4:>10} {5:>14} {6:>14} {7:>8}".format(
+        "columns", "leaves", "input", "mode", "cells", "walk rows/s", "binned rows/s", "speedup"))
+    for n_features, n in cases:
+        features = FEATURES[:n_features]
+        with tempfile.TemporaryDirectory() as tmp:
+            file_name = os.path.join(tmp, "report.txt")
+            write_report(file_name, n, attributes=features, seed=n)
+            parser = t2t.Tanagra_Parser()
+            parser.parse(file_name)
+
+        # uniform rows, and rows repeating a few thousand
+        # records as low cardinality data does
+        walked = parser.compile(features)
+        records = rng.uniform(0, 100, size=(5000, n_features))
+        inputs = (("uniform", rng.uniform(0, 100, size=(n_rows, n_features))),
+                  ("repeated", records[rng.integers(0, len(records), n_rows)]))
+        for name, X in inputs:
+            binned = parser.compile_binned(features)
+            slow, expected = rate(walked, X)
+            fast, leaves = rate(binned, X)
+            assert (leaves == expected).all()
+            print("{0:>8} {1:>8} {2:>9} {3:>8} {4:>10.3g} {5:>14,.0f} {6:>14,.0f} {7:>7.2f}x".format(
+                n_features, n, name, binned.mode, binned.cells, slow, fast, fast / slow))
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 500000)
@@ -0,0 +1,59 @@
+import importlib.util
+import os
+import random
+import sys
+import tempfile
+import time
+import tana2tree as t2t
+from tana2tree.generator import write_report
+from common import FEATURES, report_predict, report_tree
+
+def walk(parser, row):
+    # interpret the node graph for one row
+    node = parser.root
+    while node.op is not None:
+        if row[parser.orig_labels[node.attr]] < node.value:
+            node = node.l_branch
+        else:
+            node = node.r_branch
+    return parser.orig_labels[node.attr]
+
+def per_row(fn, rows):
+    start = time.perf_counter()
+    for row in rows:
+        fn(row)
+    return (time.perf_counter() - start) / len(rows) * 1e6
+
+def main(n_rows=20000, sizes=(15, 255, 1023)):
+    rng = random.Random(0)
+    print("{0:>8} {1:>12} {2:>12} {3:>12}".format("leaves", "walk (us)", "codegen (us)", "import (us)"))
+    for n in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            file_name = os.path.join(tmp, "report.txt")
+            write_report(file_name, n, attributes=FEATURES)
+            parser = t2t.Tanagra_Parser()
+            parser.parse(file_name)
+            truth = report_tree(file_name)
+
+            # generated module must import and agree too
+            module_name = os.path.join(tmp, "scorer.py")
+            parser.write_module(module_name)
+            spec = importlib.util.spec_from_file_location("scorer", module_name)
+            scorer = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(scorer)
+
+        predict = parser.to_function()
+        assert parser.to_function() is predict
+        rows = [[rng.uniform(0, 100) for _ in predict.features] for _ in range(n_rows)]
+        named = [dict(zip(predict.features, row)) for row in rows]
+
+        # generated code must match tree traversal and the
+        # report's own rules keyed by the true names
+        for row, named_row in zip(rows, named):
+            assert predict(row) == scorer.predict(row) == walk(parser, named_row) == report_predict(truth, named_row)
+
+        print("{0:>8} {1:>12.2f} {2:>12.2f} {3:>12.2f}".format(
+            n, per_row(lambda row: walk(parser, row), named), per_row(predict, rows), per_row(scorer.predict, rows)))
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
@@ -0,0 +1,78 @@
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+import numpy as np
+import pandas as pd
+import tana2tree as t2t
+from tana2tree.columnar import Column_Scorer
+from tana2tree.generator import write_report
+from common import FEATURES
+
+def make_frames(n_rows, chunk=100000):
+    # made in chunks so the input never sits in memory
+    rng = np.random.default_rng(0)
+    for start in range(0, n_rows, chunk):
+        n = min(chunk, n_rows - start)
+        frame = pd.DataFrame(rng.uniform(0, 100, size=(n, len(FEATURES))), columns=FEATURES)
+        frame.insert(0, "id", np.arange(start, start + n))
+        yield frame
+
+def make_csv(file_name, n_rows):
+    for i, frame in enumerate(make_frames(n_rows)):
+        frame.to_csv(file_name, mode="a", header=i == 0, index=False)
+
+def make_parquet(file_name, n_rows):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    writer = None
+    for frame in make_frames(n_rows):
+        table = pa.Table.from_pandas(frame, preserve_index=False)
+        if writer is None:
+            writer = pq.ParquetWriter(file_name, table.schema)
+        writer.write_table(table)
+    writer.close()
+
+def main(n_rows=1000000, batch_sizes=(1024, 16 * 1024, 256 * 1024)):
+    with tempfile.TemporaryDirectory() as tmp:
+        report = os.path.join(tmp, "report.txt")
+        write_report(report, 1023, attributes=FEATURES, seed=1)
+        parser = t2t.Tanagra_Parser()
+        parser.parse(report)
+        scorer = Column_Scorer(parser.compile(FEATURES))
+
+        inputs = [os.path.join(tmp, "input.csv")]
+        make_csv(inputs[0], n_rows)
+        try:
+            make_parquet(os.path.join(tmp, "input.parquet"), n_rows)
+            inputs.append(os.path.join(tmp, "input.parquet"))
+        except ImportError:
+            print("pyarrow not installed, parquet skipped")
+
+        print("{0:>14} {1:>10} {2:>14} {3:>14}".format("input", "batch", "rows/s", "peak MiB"))
+        for input_file in inputs:
+            expected = None
+            for batch_size in batch_sizes:
+                output_file = os.path.join(tmp, "scored" + os.path.splitext(input_file)[1])
+                tracemalloc.start()
+                start = time.perf_counter()
+                rows = scorer.score_file(input_file, output_file, batch_size, keep=["id"])
+                seconds = time.perf_counter() - start
+                peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+                assert rows == n_rows
+
+                # every batch size gives the same predictions
+                if output_file.endswith(".csv"):
+                    predicted = pd.read_csv(output_file)["prediction"].to_numpy()
+                else:
+                    predicted = pd.read_parquet(output_file)["prediction"].to_numpy()
+                if expected is None:
+                    expected = predicted
+                assert (predicted == expected).all()
+                print("{0:>14} {1:>10,} {2:>14,.0f} {3:>14.1f}".format(
+                    os.path.basename(input_file), batch_size, rows / seconds, peak / 2 ** 20))
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000000)
@@ -0,0 +1,42 @@
+import os
+import sys
+import tempfile
+import time
+import numpy as np
+from tana2tree.forest import Forest
+from tana2tree.generator import write_report
+from common import MANY_FEATURES as FEATURES
+
+def main(n_rows=100000, tree_counts=(1, 10, 50), worker_counts=(1, 2, 4), n_leaves=255):
+    rng = np.random.default_rng(0)
+    X = rng.uniform(0, 100, size=(n_rows, len(FEATURES)))
+    print("cpus: {0}".format(os.cpu_count()))
+    print("{0:>6} {1:>8} {2:>8} {3:>14}".format("trees", "pool", "workers", "rows/s"))
+    with tempfile.TemporaryDirectory() as tmp:
+        for n_trees in tree_counts:
+            # each tree sees its own slice of the attributes
+            for i in range(n_trees):
+                attributes = [FEATURES[(i + j) % len(FEATURES)] for j in range(30)]
+                write_report(os.path.join(tmp, "tree{0:03}.txt".format(i)), n_leaves, attributes=attributes, seed=i)
+            paths = [os.path.join(tmp, "tree{0:03}.txt".format(i)) for i in range(n_trees)]
+
+            expected = None
+            for pool in ("thread", "process"):
+                for workers in worker_counts:
+                    if pool == "process" and workers == 1:
+                        continue
+                    with Forest(paths, workers=workers, pool=pool) as forest:
+                        columns = {name: X[:, FEATURES.index(name)] for name in forest.features}
+                        forest.predict(columns)
+
+                        start = time.perf_counter()
+                        predicted = forest.predict(columns)
+                        rate = n_rows / (time.perf_counter() - start)
+
+                    if expected is None:
+                        expected = predicted
+                    assert (predicted == expected).all()
+                    print("{0:>6} {1:>8} {2:>8} {3:>14,.0f}".format(n_trees, pool if workers > 1 else "none", workers, rate))
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
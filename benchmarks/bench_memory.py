@@ -0,0 +1,53 @@
+import gc
+import tracemalloc
+import tana2tree as t2t
+import tana2tree.tree as t
+from tana2tree.compact import Compact_Tree
+
+def build_tree(labels):
+    # balanced tree with unique labels,
+    # built directly so parsing isn't measured
+    root = t.Tree_Node(None, None, labels[0], "<", 0.5)
+    level, count = [root], 1
+    while count < len(labels):
+        next_level = []
+        for node in level:
+            for op in ("<", ">="):
+                if count < len(labels):
+                    next_level.append(node.add_child(op, labels[count], "<", count / 7.0))
+                    count = count + 1
+        level = next_level
+
+    # remaining open nodes become leaves
+    for node in level:
+        node.op = node.value = None
+    return root
+
+def traced(fn):
+    gc.collect()
+    tracemalloc.start()
+    result = fn()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return size, result
+
+def main(sizes=(10000, 100000)):
+    print("{0:>8} {1:>14} {2:>14} {3:>8}".format("nodes", "Tree_Node (KB)", "compact (KB)", "ratio"))
+    for n in sizes:
+        # labels are allocated up front and
+        # shared by both representations
+        labels = ["n{0}".format(i) for i in range(n)]
+        graph_size, root = traced(lambda: build_tree(labels))
+
+        parser = t2t.Tanagra_Parser()
+        parser.root = root
+        parser.orig_labels = {label: label for label in labels}
+        table = parser.to_table()
+        del root, parser
+
+        compact_size, compact = traced(lambda: Compact_Tree(table))
+        print("{0:>8} {1:>14,.0f} {2:>14,.0f} {3:>7.1f}x".format(
+            n, graph_size / 1024, compact_size / 1024, graph_size / compact_size))
+
+if __name__ == '__main__':
+    main()
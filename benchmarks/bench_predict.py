@@ -0,0 +1,56 @@
+import os
+import sys
+import tempfile
+import time
+import numpy as np
+import tana2tree as t2t
+from tana2tree.generator import write_report
+from common import FEATURES, report_predict, report_tree
+
+def naive_predict(parser, rows):
+    # walk the node graph one row at a time
+    out = []
+    for row in rows:
+        node = parser.root
+        while node.op is not None:
+            if row[parser.orig_labels[node.attr]] < node.value:
+                node = node.l_branch
+            else:
+                node = node.r_branch
+        out.append(parser.orig_labels[node.attr])
+    return out
+
+def main(n_rows=200000, sizes=(15, 255, 1023)):
+    rng = np.random.default_rng(0)
+    print("{0:>8} {1:>10} {2:>14} {3:>14} {4:>8}".format("leaves", "rows", "naive rows/s", "numpy rows/s", "speedup"))
+    for n in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            file_name = os.path.join(tmp, "report.txt")
+            write_report(file_name, n, attributes=FEATURES)
+            parser = t2t.Tanagra_Parser()
+            parser.parse(file_name)
+            truth = report_tree(file_name)
+
+        tree = parser.compile(FEATURES)
+        X = rng.uniform(0, 100, size=(n_rows, len(tree.features)))
+
+        start = time.perf_counter()
+        predicted = tree.predict(X)
+        fast = n_rows / (time.perf_counter() - start)
+
+        # the naive walk gets a slice of the rows
+        n_naive = min(n_rows, 20000)
+        rows = [dict(zip(tree.features, x)) for x in X[:n_naive].tolist()]
+        start = time.perf_counter()
+        expected = naive_predict(parser, rows)
+        slow = n_naive / (time.perf_counter() - start)
+        assert list(predicted[:n_naive]) == expected
+
+        # and both agree with the report's own rules
+        # keyed by the true attribute names
+        assert expected == [report_predict(truth, row) for row in rows]
+
+        print("{0:>8} {1:>10} {2:>14,.0f} {3:>14,.0f} {4:>7.1f}x".format(n, n_rows, slow, fast, fast / slow))
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200000)
@@ -0,0 +1,64 @@
+import os
+import sys
+import tempfile
+import time
+import numpy as np
+import tana2tree as t2t
+from tana2tree.generator import write_report
+from common import FEATURES
+
+def best(fn, repeat=5):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+def show(profiler):
+    print("{0:>14} {1:>8} {2:>10} {3:>12} {4:>12} {5:>14}".format(
+        "stage", "calls", "ms", "bytes", "rows", "rows/s"))
+    for name, stage in profiler.as_dict().items():
+        print("{0:>14} {1:>8} {2:>10.2f} {3:>12,} {4:>12,} {5:>14,.0f}".format(
+            name, stage["calls"], stage["seconds"] * 1000, stage["bytes"], stage["rows"],
+            stage.get("rows_per_second", 0)))
+
+def main(n_leaves=20000, n_rows=200000):
+    with tempfile.TemporaryDirectory() as tmp:
+        file_name = os.path.join(tmp, "report.txt")
+        write_report(file_name, n_leaves, attributes=FEATURES, seed=1)
+
+        # profiling off is the default path
+        plain = t2t.Tanagra_Parser()
+        off = best(lambda: plain.parse(file_name))
+        profiler = t2t.Profiler()
+        profiled = t2t.Tanagra_Parser(profiler=profiler)
+        on = best(lambda: profiled.parse(file_name))
+        assert profiled.make_dict() == plain.make_dict()
+        print("parse of {0} leaves: {1:.1f} ms off, {2:.1f} ms on ({3:+.0%})".format(
+            n_leaves, off * 1000, on * 1000, on / off - 1))
+        show(profiler)
+
+        profiler.reset()
+        profiled.parse_stream(file_name)
+        assert profiled.make_dict() == plain.make_dict()
+        print("\nparse_stream")
+        show(profiler)
+
+    X = np.random.default_rng(0).uniform(0, 100, size=(n_rows, len(FEATURES)))
+    compiled = plain.compile(FEATURES)
+    off = best(lambda: compiled.apply(X))
+    profiler.reset()
+    compiled = profiled.compile(FEATURES)
+    on = best(lambda: compiled.apply(X))
+    print("\napply of {0} rows: {1:.1f} ms off, {2:.1f} ms on ({3:+.0%})".format(
+        n_rows, off * 1000, on * 1000, on / off - 1))
+    show(profiler)
+    stage = profiler.as_dict()["score"]
+    print("node visits per row: {0:.1f}".format(stage["visits"] / stage["rows"]))
+
+    print()
+    print(profiler.to_prometheus(labels={"model": "bench"}), end="")
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
@@ -0,0 +1,70 @@
+import os
+import sys
+import tempfile
+import threading
+import time
+import numpy as np
+from tana2tree.registry import Model_Registry
+from tana2tree.generator import write_report
+from common import FEATURES
+
+def timed(fn):
+    start = time.perf_counter()
+    out = fn()
+    return time.perf_counter() - start, out
+
+def main(n_models=200, n_changed=20, n_leaves=500):
+    X = np.random.default_rng(0).uniform(0, 100, size=(1000, len(FEATURES)))
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = [os.path.join(tmp, "model{0:03}.txt".format(i)) for i in range(n_models)]
+        for i, path in enumerate(paths):
+            write_report(path, n_leaves, attributes=FEATURES, seed=i)
+
+        registry = Model_Registry(compiled=True, features=FEATURES, track_memory=True)
+        seconds, _ = timed(lambda: [registry.watch("model{0}".format(i), path) for i, path in enumerate(paths)])
+        print("{0} models of {1} leaves loaded in {2:.2f} s".format(n_models, n_leaves, seconds))
+
+        # scoring keeps going through every reload
+        stop, scored, failed = threading.Event(), [0], [0]
+        def score():
+            while not stop.is_set():
+                try:
+                    registry.predict("model0", X)
+                    scored[0] = scored[0] + 1
+                except Exception:
+                    failed[0] = failed[0] + 1
+        scorer = threading.Thread(target=score)
+        scorer.start()
+
+        seconds, reloaded = timed(registry.check)
+        print("check, nothing changed: {0:.2f} ms, {1} reloaded".format(seconds * 1000, len(reloaded)))
+
+        for path in paths[:n_changed]:
+            os.utime(path, ns=(time.time_ns(), time.time_ns() + 10 ** 9))
+        seconds, reloaded = timed(registry.check)
+        print("check, {0} touched: {1:.2f} ms, {2} reloaded".format(n_changed, seconds * 1000, len(reloaded)))
+
+        for i, path in enumerate(paths[:n_changed]):
+            write_report(path, n_leaves, attributes=FEATURES, seed=n_models + i)
+        seconds, reloaded = timed(registry.check)
+        print("check, {0} rewritten: {1:.2f} ms, {2} reloaded".format(n_changed, seconds * 1000, len(reloaded)))
+
+        with open(paths[0], "w") as file_out:
+            file_out.write("<HTML>truncated")
+        before = registry.get("model0")
+        registry.check()
+        assert registry.get("model0") is before
+
+        stop.set()
+        scorer.join()
+
+        stats = registry.stats()
+        changed = [stats["model{0}".format(i)] for i in range(n_changed)]
+        print("reload latency: mean {0:.1f} ms, max {1:.1f} ms".format(
+            1000 * sum(s["load_seconds"] for s in changed) / n_changed, 1000 * max(s["load_seconds"] for s in changed)))
+        print("memory per model: mean {0:,.0f} KB".format(sum(s["memory"] for s in changed) / n_changed / 1024))
+        print("broken report kept model0 at version {0}: {1}".format(stats["model0"]["version"], stats["model0"]["error"]))
+        print("scored {0} batches during reloads, {1} failed".format(scored[0], failed[0]))
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
@@ -0,0 +1,58 @@
+import os
+import sys
+import tempfile
+import time
+import numpy as np
+import tana2tree as t2t
+from tana2tree.generator import write_report
+from common import FEATURES
+
+def walk_paths(tree, X):
+    # one walk from the root per row
+    out = []
+    for x in X:
+        i, path = 0, []
+        while tree.feature[i] >= 0:
+            name, value = tree.features[tree.feature[i]], float(tree.threshold[i])
+            if x[tree.feature[i]] < value:
+                path.append((name, "<", value))
+                i = tree.left[i]
+            else:
+                path.append((name, ">=", value))
+                i = tree.right[i]
+        out.append(tuple(path))
+    return out
+
+def main(n_rows=1000000, sizes=(255, 4095, 65535), n_walked=20000):
+    rng = np.random.default_rng(0)
+    print("{0:>8} {1:>10} {2:>14} {3:>14} {4:>14}".format(
+        "leaves", "table ms", "walk rows/s", "gather rows/s", "text rows/s"))
+    for n in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            file_name = os.path.join(tmp, "report.txt")
+            write_report(file_name, n, attributes=FEATURES, seed=n)
+            parser = t2t.Tanagra_Parser()
+            parser.parse(file_name)
+
+        tree = parser.compile(FEATURES)
+        start = time.perf_counter()
+        table = tree.rule_table()
+        built = time.perf_counter() - start
+        X = rng.uniform(0, 100, size=(n_rows, len(FEATURES)))
+
+        # rules gathered by leaf id match a walk per row
+        start = time.perf_counter()
+        walked = walk_paths(tree, X[:n_walked])
+        walk = n_walked / (time.perf_counter() - start)
+        assert list(table.explain(tree.apply(X[:n_walked]), as_text=False)) == walked
+
+        start = time.perf_counter()
+        table.explain(tree.apply(X), as_text=False)
+        gather = n_rows / (time.perf_counter() - start)
+        start = time.perf_counter()
+        tree.explain(X)
+        text = n_rows / (time.perf_counter() - start)
+        print("{0:>8} {1:>10.1f} {2:>14,.0f} {3:>14,.0f} {4:>14,.0f}".format(n, built * 1000, walk, gather, text))
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000000)
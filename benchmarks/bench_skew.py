@@ -0,0 +1,63 @@
+import os
+import sys
+import tempfile
+import time
+import numpy as np
+import tana2tree as t2t
+from tana2tree.generator import write_report
+from common import FEATURES
+
+def leaf_boxes(tree):
+    # value range of every feature at each leaf
+    lo = np.zeros((len(tree), len(tree.features)))
+    hi = np.full((len(tree), len(tree.features)), 100.0)
+    stack = [0]
+    while stack:
+        i = stack.pop()
+        f = tree.feature[i]
+        if f < 0:
+            continue
+        for child, side in ((tree.left[i], hi), (tree.right[i], lo)):
+            lo[child], hi[child] = lo[i], hi[i]
+            side[child, f] = tree.threshold[i]
+            stack.append(child)
+    return lo, hi
+
+def skewed_rows(tree, n_rows, rng):
+    # draw leaves as often as training examples reached them
+    leaves = np.flatnonzero(tree.feature < 0)
+    weights = tree.examples[leaves] / tree.examples[leaves].sum()
+    ids = rng.choice(leaves, size=n_rows, p=weights)
+    lo, hi = leaf_boxes(tree)
+    return lo[ids] + rng.uniform(size=(n_rows, len(tree.features))) * (hi[ids] - lo[ids])
+
+def rate(tree, X):
+    tree.predict(X[:1000])
+    start = time.perf_counter()
+    predicted = tree.predict(X)
+    return X.shape[0] / (time.perf_counter() - start), predicted
+
+def main(n_rows=200000, sizes=(63, 255, 1023), skew=0.9):
+    rng = np.random.default_rng(0)
+    print("{0:>8} {1:>8} {2:>10} {3:>14} {4:>14} {5:>8}".format(
+        "leaves", "input", "hot depth", "level rows/s", "hot rows/s", "speedup"))
+    for n in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            file_name = os.path.join(tmp, "report.txt")
+            write_report(file_name, n, attributes=FEATURES, skew=skew, seed=n)
+            parser = t2t.Tanagra_Parser()
+            parser.parse(file_name)
+
+        level = parser.compile(FEATURES)
+        hot = parser.compile(FEATURES, layout="hot")
+        inputs = (("skewed", skewed_rows(level, n_rows, rng)),
+                  ("uniform", rng.uniform(0, 100, size=(n_rows, len(FEATURES)))))
+        for name, X in inputs:
+            slow, expected = rate(level, X)
+            fast, predicted = rate(hot, X)
+            assert (predicted == expected).all()
+            print("{0:>8} {1:>8} {2:>10} {3:>14,.0f} {4:>14,.0f} {5:>7.2f}x".format(
+                n, name, hot.hot_depth, slow, fast, fast / slow))
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200000)
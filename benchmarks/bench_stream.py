@@ -0,0 +1,49 @@
+import gc
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+import tana2tree as t2t
+from tana2tree.generator import write_report
+from common import MANY_FEATURES as FEATURES
+
+def measure(fn):
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    parser = fn()
+    elapsed = time.perf_counter() - start
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, retained, peak, parser
+
+def main(sizes=(1000, 4000, 8000), chunk_size=64 * 1024):
+    print("{0:>8} {1:>10} {2:>8} {3:>12} {4:>12} {5:>12}".format(
+        "leaves", "file (KB)", "mode", "time (s)", "tree (KB)", "peak (KB)"))
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in sizes:
+            file_name = os.path.join(tmp, "report.txt")
+            write_report(file_name, n, attributes=FEATURES)
+            size = os.path.getsize(file_name) / 1024
+
+            def whole():
+                parser = t2t.Tanagra_Parser()
+                parser.parse(file_name)
+                return parser
+
+            def stream():
+                parser = t2t.Tanagra_Parser()
+                parser.parse_stream(file_name, chunk_size)
+                return parser
+
+            tables = []
+            for mode, fn in (("whole", whole), ("stream", stream)):
+                elapsed, retained, peak, parser = measure(fn)
+                tables.append(parser.to_table())
+                print("{0:>8} {1:>10,.0f} {2:>8} {3:>12.3f} {4:>12,.0f} {5:>12,.0f}".format(
+                    n, size, mode, elapsed, retained / 1024, peak / 1024))
+            assert tables[0] == tables[1]
+
+if __name__ == '__main__':
+    main(chunk_size=int(sys.argv[1]) if len(sys.argv) > 1 else 4 * 1024)
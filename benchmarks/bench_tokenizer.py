@@ -0,0 +1,47 @@
+import re
+import sys
+import time
+import tana2tree.tokenizer as tk
+from tana2tree.generator import make_report
+
+def legacy_tokenize(descr):
+    # tag scan used by parse() before the tokenizer,
+    # every search copies the rest of the document
+    events = []
+    start_index = 0
+    while re.search("</*..>", descr[start_index:]):
+        tag = re.search("</*..>", descr[start_index:]).group(0)
+        start_index = start_index + re.search("</*..>", descr[start_index:]).end()
+        if tag == "<LI>":
+            events.append((tag, descr[start_index:start_index + re.search("</*..>", descr[start_index:]).start()]))
+        else:
+            events.append((tag, None))
+    return events
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return time.perf_counter() - start, result
+
+def main(sizes=(1000, 5000, 10000, 50000), legacy_max=50000):
+    # the legacy scan is quadratic, the 50k leaf document
+    # alone takes minutes of it, pass a smaller
+    # legacy_max on the command line to skip it
+    print("{0:>8} {1:>10} {2:>12} {3:>12} {4:>9}".format("leaves", "bytes", "legacy (s)", "single (s)", "speedup"))
+    for n in sizes:
+        descr = re.sub("\(.*?\)|<\/?[b]>", "", make_report(n))
+        descr = re.search("<UL>(.*)</UL>", descr).group(0)
+
+        new_time, events = timed(lambda d: list(tk.Tanagra_Tokenizer(d)), descr)
+        if n <= legacy_max:
+            old_time, old_events = timed(legacy_tokenize, descr)
+            assert old_events == events
+            speedup = "{0:.0f}x".format(old_time / new_time)
+            old_time = "{0:.3f}".format(old_time)
+        else:
+            old_time = speedup = "skipped"
+
+        print("{0:>8} {1:>10} {2:>12} {3:>12.3f} {4:>9}".format(n, len(descr), old_time, new_time, speedup))
+
+if __name__ == '__main__':
+    main(legacy_max=int(sys.argv[1]) if len(sys.argv) > 1 else 50000)
@@ -0,0 +1,58 @@
+import importlib.util
+import os
+import re
+
+# the generator is loaded from this checkout rather than the
+# installed package, so releases without it can be measured
+_SPEC = importlib.util.spec_from_file_location("generator", os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tana2tree", "generator.py"))
+generator = importlib.util.module_from_spec(_SPEC)
+_SPEC.loader.exec_module(generator)
+make_attributes = generator.make_attributes
+write_report = generator.write_report
+
+# attribute names shared by the benchmarks, abbreviations
+# collide as they do in real reports so label postfixes and
+# nested reuse of a label are exercised
+FEATURES = make_attributes(30)
+MANY_FEATURES = make_attributes(150)
+
+# splits and leaves as written in a report, read without
+# the parser so checks compare against the true names
+RULE = re.compile(r"<UL>|</UL>|<LI>([^<]*?) (<|>=) ([\d.,]+)(?:[^<]*<b>([^<]*)</b>)?")
+
+def report_tree(file_name):
+    # nested (name, value, left, right) tuples, leaves are class names
+    with open(file_name) as file_in:
+        rules = RULE.finditer(file_in.read())
+    stack = []
+    for m in rules:
+        if m.group(0) == "<UL>":
+            stack.append([])
+        elif m.group(0) == "</UL>":
+            (name, value, left), (_, _, right) = stack.pop()
+            if not stack:
+                return name, value, left, right
+            stack[-1][-1] = stack[-1][-1][:2] + ((name, value, left, right),)
+        else:
+            stack[-1].append((m.group(1), float(m.group(3).replace(",", "")), m.group(4)))
+
+def report_nodes(tree):
+    # (name, value) of splits and class names of leaves in pre-order
+    out, stack = [], [tree]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, str):
+            out.append(node)
+            continue
+        name, value, left, right = node
+        out.append((name, value))
+        stack.extend((right, left))
+    return out
+
+def report_predict(tree, row):
+    # class of one row keyed by the true attribute names
+    while not isinstance(tree, str):
+        name, value, left, right = tree
+        tree = left if row[name] < value else right
+    return tree
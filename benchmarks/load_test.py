@@ -0,0 +1,95 @@
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import numpy as np
+from tana2tree.generator import write_report
+from common import FEATURES
+
+async def request(reader, writer, method, path, payload=None):
+    body = b"" if payload is None else json.dumps(payload).encode("utf-8")
+    writer.write("{0} {1} HTTP/1.1\r\nHost: localhost\r\nContent-Type: application/json\r\n"
+                 "Content-Length: {2}\r\n\r\n".format(method, path, len(body)).encode("latin-1") + body)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        key, _, value = line.decode("latin-1").partition(":")
+        if key.lower() == "content-length":
+            length = int(value)
+    return status, json.loads(await reader.readexactly(length))
+
+async def client(host, port, rows, n_requests, latencies):
+    # one keep-alive connection sending one row per request
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for i in range(n_requests):
+            start = time.perf_counter()
+            status, out = await request(reader, writer, "POST", "/predict", {"row": rows[i % len(rows)]})
+            latencies.append(time.perf_counter() - start)
+            assert status == 200, out
+    finally:
+        writer.close()
+
+async def run(host, port, clients, n_requests):
+    rows = np.random.default_rng(0).uniform(0, 100, size=(1000, len(FEATURES))).tolist()
+    latencies = []
+    start = time.perf_counter()
+    await asyncio.gather(*(client(host, port, rows, n_requests, latencies) for _ in range(clients)))
+    elapsed = time.perf_counter() - start
+
+    reader, writer = await asyncio.open_connection(host, port)
+    _, stats = await request(reader, writer, "GET", "/stats")
+    writer.close()
+    latencies.sort()
+    return (len(latencies) / elapsed, latencies[len(latencies) // 2] * 1000,
+            latencies[int(len(latencies) * 0.99)] * 1000, next(iter(stats.values())))
+
+def start_server(report, max_batch, max_wait_ms):
+    server = subprocess.Popen([sys.executable, "-m", "tana2tree.server", "model=" + report, "--port", "0",
+                               "--max-batch", str(max_batch), "--max-wait-ms", str(max_wait_ms)],
+                              stdout=subprocess.PIPE, text=True)
+    line = server.stdout.readline()
+    if not line:
+        raise RuntimeError("server did not start")
+    return server, int(line.rsplit(":", 1)[1])
+
+def main(argv=None):
+    args = argparse.ArgumentParser(description="Load test the scoring server on localhost.")
+    args.add_argument("--clients", type=int, default=64, help="concurrent connections")
+    args.add_argument("--requests", type=int, default=200, help="requests per connection")
+    args.add_argument("--port", type=int, default=None, help="test a server already running on this port")
+    args = args.parse_args(argv)
+
+    if args.port is not None:
+        rps, p50, p99, stats = asyncio.run(run("127.0.0.1", args.port, args.clients, args.requests))
+        print("{0:,.0f} requests/s, p50 {1:.2f} ms, p99 {2:.2f} ms".format(rps, p50, p99))
+        print(json.dumps(stats, indent=2))
+        return
+
+    print("{0:>10} {1:>8} {2:>12} {3:>9} {4:>9} {5:>11} {6:>11}".format(
+        "max batch", "wait ms", "requests/s", "p50 ms", "p99 ms", "mean batch", "server p99"))
+    with tempfile.TemporaryDirectory() as tmp:
+        report = os.path.join(tmp, "report.txt")
+        write_report(report, 1023, attributes=FEATURES, seed=1)
+
+        # one row per call is the unbatched baseline
+        for max_batch, max_wait_ms in ((1, 0), (64, 1), (256, 2)):
+            server, port = start_server(report, max_batch, max_wait_ms)
+            try:
+                rps, p50, p99, stats = asyncio.run(run("127.0.0.1", port, args.clients, args.requests))
+            finally:
+                server.terminate()
+                server.wait()
+            print("{0:>10} {1:>8} {2:>12,.0f} {3:>9.2f} {4:>9.2f} {5:>11.1f} {6:>11.2f}".format(
+                max_batch, max_wait_ms, rps, p50, p99, stats["mean_batch"], stats["latency_ms"]["p99"]))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,131 @@
+import argparse
+import collections
+import contextlib
+import gc
+import io
+import json
+import os
+import platform
+import tempfile
+import time
+import tracemalloc
+import tana2tree as t2t
+from common import report_nodes, report_tree, write_report
+
+def parsed(file_name):
+    parser = t2t.Tanagra_Parser()
+    parser.parse(file_name)
+    return parser
+
+# operation name -> (setup, operation), setup runs untimed
+# and its result is passed on, operations the parser
+# under test lacks are left out
+def operations(file_name):
+    def stream(_):
+        t2t.Tanagra_Parser().parse_stream(file_name)
+
+    def get_node(parser):
+        for node in parser.traverse():
+            parser.get_node(node.attr)
+
+    def print_tree(parser):
+        with contextlib.redirect_stdout(io.StringIO()):
+            parser.print_tree()
+
+    ops = {
+        "parse": (lambda: None, lambda _: parsed(file_name)),
+        "parse_stream": (lambda: None, stream),
+        "traverse": (lambda: parsed(file_name), lambda p: p.traverse()),
+        "get_node": (lambda: parsed(file_name), get_node),
+        "make_dict": (lambda: parsed(file_name), lambda p: p.make_dict()),
+        "print_tree": (lambda: parsed(file_name), print_tree),
+    }
+    return {name: op for name, op in ops.items() if hasattr(t2t.Tanagra_Parser, name)}
+
+def check_labels(file_name):
+    # report nodes missing from the parsed tree or without their
+    # own label and original name, nested splits with the same
+    # abbreviation included, counted so releases that lose them
+    # can still be measured
+    parser = parsed(file_name)
+    found = collections.Counter()
+    for node in parser.traverse():
+        name = parser.orig_labels.get(node.attr, node.attr)
+        if parser.get_node(node.attr)[0] is node:
+            found[(name, node.value) if node.op else name] += 1
+    expected = collections.Counter(report_nodes(report_tree(file_name)))
+    return sum((expected - found).values())
+
+def measure(setup, operation, repeat):
+    # best wall time over repeat runs
+    state = setup()
+    best = float("inf")
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        operation(state)
+        best = min(best, time.perf_counter() - start)
+
+    # peak memory above what setup left behind
+    gc.collect()
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    operation(state)
+    peak = tracemalloc.get_traced_memory()[1] - base
+    tracemalloc.stop()
+    return best, peak
+
+def run(sizes, repeat, style, label):
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in sizes:
+            file_name = os.path.join(tmp, "report.txt")
+            write_report(file_name, n, style=style)
+            wrong = check_labels(file_name)
+            if wrong:
+                print("{0:>8} {1} of {2} nodes mislabeled".format(n, wrong, 2 * n - 1))
+            for name, (setup, operation) in operations(file_name).items():
+                seconds, peak = measure(setup, operation, repeat)
+                results.append({"operation": name, "leaves": n, "nodes": 2 * n - 1,
+                                "file_bytes": os.path.getsize(file_name),
+                                "seconds": seconds, "peak_bytes": peak, "mislabeled": wrong})
+                print("{0:>8} {1:>14} {2:>12.4f} s {3:>12,.0f} KB".format(n, name, seconds, peak / 1024))
+
+    return {"label": label, "python": platform.python_version(), "platform": platform.platform(),
+            "style": style, "repeat": repeat, "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "results": results}
+
+def compare(old_file, new_file):
+    with open(old_file) as f: old = json.load(f)
+    with open(new_file) as f: new = json.load(f)
+    before = {(r["operation"], r["leaves"]): r for r in old["results"]}
+
+    print("{0:>14} {1:>8} {2:>10} {3:>10}".format("operation", "leaves", "time", "peak"))
+    for r in new["results"]:
+        key = (r["operation"], r["leaves"])
+        if key in before:
+            b = before[key]
+            print("{0:>14} {1:>8} {2:>9.2f}x {3:>9.2f}x".format(
+                key[0], key[1], b["seconds"] / max(r["seconds"], 1e-9), b["peak_bytes"] / max(r["peak_bytes"], 1)))
+
+def main():
+    args = argparse.ArgumentParser(description="Benchmark tana2tree on generated Tanagra reports.")
+    args.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000], help="leaf counts")
+    args.add_argument("--repeat", type=int, default=3, help="timed runs per operation")
+    args.add_argument("--style", default="mixed", help="attribute naming style")
+    args.add_argument("--label", default="", help="name for this run, e.g. a release")
+    args.add_argument("--output", default="results.json", help="where to write results")
+    args.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="print speedups of NEW over OLD")
+    args = args.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    report = run(args.sizes, args.repeat, args.style, args.label)
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=1)
+    print("results written to {0}".format(args.output))
+
+if __name__ == '__main__':
+    main()
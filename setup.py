@@ -1,22 +1,27 @@
-import setuptools
-
-with open("README.md", "r") as fh:
-    long_description = fh.read()
-
-setuptools.setup(
-    name="tana2tree",
-    version="1.1.19",
-    author="Bradley Reeves",
-    author_email="bradleyaaronreeeves@gmail.com",
-    description="Parses Tanagra description into usable formats.",
-    long_description=long_description,
-    long_description_content_type="text/markdown",
-    url="https://github.com/reevesba/tana2tree",
-    packages=setuptools.find_packages(),
-    classifiers=[
-        "Programming Language :: Python :: 3",
-        "License :: OSI Approved :: MIT License",
-        "Operating System :: OS Independent",
-    ],
-    python_requires='>=3.6',
+import setuptools
+
+with open("README.md", "r") as fh:
+    long_description = fh.read()
+
+setuptools.setup(
+    name="tana2tree",
+    version="1.1.19",
+    author="Bradley Reeves",
+    author_email="bradleyaaronreeeves@gmail.com",
+    description="Parses Tanagra description into usable formats.",
+    long_description=long_description,
+    long_description_content_type="text/markdown",
+    url="https://github.com/reevesba/tana2tree",
+    packages=setuptools.find_packages(),
+    extras_require={"numpy": ["numpy"],
+                    "pandas": ["numpy", "pandas"],
+                    "arrow": ["numpy", "pandas", "pyarrow"]},
+    entry_points={"console_scripts": ["tana2tree-bulk=tana2tree.bulk:main",
+                                      "tana2tree-serve=tana2tree.server:main"]},
+    classifiers=[
+        "Programming Language :: Python :: 3",
+        "License :: OSI Approved :: MIT License",
+        "Operating System :: OS Independent",
+    ],
+    python_requires='>=3.6',
 )
\ No newline at end of file
@@ -1 +1,27 @@
-from .tana2tree import *
+import importlib
+import sys
+from .tana2tree import *
+from .profiler import Profiler
+
+# modules pulling in asyncio, multiprocessing and
+# friends load on first use to keep imports fast
+_LAZY = {"parse_many": "bulk", "Bulk_Result": "bulk",
+         "Parse_Cache": "cache",
+         "aparse": "aio", "aparse_many": "aio",
+         "Model_Registry": "registry"}
+
+def __getattr__(name):
+    if name in _LAZY:
+        value = getattr(importlib.import_module("." + _LAZY[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError("module {0!r} has no attribute {1!r}".format(__name__, name))
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY))
+
+# python 3.6 has no module __getattr__,
+# the names are imported right away there
+if sys.version_info < (3, 7):
+    for _name in _LAZY:
+        __getattr__(_name)
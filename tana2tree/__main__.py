@@ -0,0 +1,4 @@
+import sys
+from tana2tree.bulk import main
+
+sys.exit(main())
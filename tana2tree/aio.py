@@ -0,0 +1,123 @@
+# Author:   Bradley Reeves <bradleyaaronreeves@gmail.com>
+# Date:     October 18, 2020
+# About:    Converts a Tanagra tree description from HTML
+#           to a usable format.
+
+import asyncio
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import tana2tree.bulk as b
+import tana2tree.tana2tree as t2t
+
+# parsing holds the GIL, more threads do not parse faster
+# but take turns with the loop thread and stall it, so one
+# thread parses unless an executor is given
+_THREAD = ThreadPoolExecutor(1, thread_name_prefix="tana2tree")
+
+# parse one report, runs in a thread
+def parse_report(path):
+    ''' Parameters
+        ----------
+        path: path/name of report as string
+
+        Returns
+        -------
+        tanagra parser object holding the tree
+    '''
+    parser = t2t.Tanagra_Parser()
+    parser.parse(path)
+    return parser
+
+# rebuild a tree sent back by a process, runs in a thread
+def from_table(table):
+    ''' Parameters
+        ----------
+        table: tree from Tanagra_Parser.to_table
+
+        Returns
+        -------
+        tanagra parser object holding the tree
+    '''
+    parser = t2t.Tanagra_Parser()
+    parser.from_table(table)
+    return parser
+
+# parse one report, runs in a process
+def parse_table(path):
+    ''' Parameters
+        ----------
+        path: path/name of report as string
+
+        Returns
+        -------
+        tree from Tanagra_Parser.to_table, errors are raised
+    '''
+    parser = t2t.Tanagra_Parser()
+    parser.parse(path)
+    return parser.to_table()
+
+# parse a report without blocking the event loop
+async def aparse(path, executor=None, timeout=None):
+    ''' Parameters
+        ----------
+        path: path/name of report as string
+        executor: executor parsing the file, one shared thread
+                  when None, a process pool keeps the loop free of
+                  parsing entirely and the tree is rebuilt in the
+                  shared thread
+        timeout: seconds to wait for the report, None waits
+                 as long as it takes
+
+        Returns
+        -------
+        tanagra parser object holding the tree, raises
+        asyncio.TimeoutError when the timeout runs out
+    '''
+    # a report already running in the executor finishes
+    # there on timeout or cancellation, one still queued
+    # is dropped
+    loop = asyncio.get_event_loop()
+
+    # nodes are never built on the loop, threads build
+    # them directly and processes send back a flat table
+    async def load():
+        if not isinstance(executor, ProcessPoolExecutor):
+            return await loop.run_in_executor(executor or _THREAD, parse_report, path)
+        table = await loop.run_in_executor(executor, parse_table, path)
+        return await loop.run_in_executor(_THREAD, from_table, table)
+
+    return await asyncio.wait_for(load(), timeout)
+
+# parse many reports without blocking the event loop
+async def aparse_many(source, concurrency=8, executor=None, timeout=None, return_exceptions=False,
+                      pattern="*.txt"):
+    ''' Parameters
+        ----------
+        source: directory, glob pattern or list of paths
+        concurrency: most reports parsed at once
+        executor: executor passed to aparse
+        timeout: seconds to wait for each report
+        return_exceptions: put errors in the results instead
+                           of cancelling the rest and raising
+        pattern: file pattern used inside a directory as string
+
+        Returns
+        -------
+        list of tanagra parser objects in submission order
+    '''
+    if concurrency < 1:
+        raise ValueError("concurrency must be at least 1")
+    limit = asyncio.Semaphore(concurrency)
+
+    async def parse_one(path):
+        async with limit:
+            return await aparse(path, executor, timeout)
+
+    tasks = [asyncio.ensure_future(parse_one(path)) for path in b.find_reports(source, pattern)]
+    try:
+        return await asyncio.gather(*tasks, return_exceptions=return_exceptions)
+    except BaseException:
+        # one failure or our own cancellation
+        # stops every report still waiting
+        for task in tasks:
+            task.cancel()
+        raise
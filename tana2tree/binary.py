@@ -0,0 +1,235 @@
+# Author:   Bradley Reeves <bradleyaaronreeves@gmail.com>
+# Date:     October 18, 2020
+# About:    Converts a Tanagra tree description from HTML
+#           to a usable format.
+
+from array import array
+from collections.abc import Mapping
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import tana2tree.compact as c
+
+# bump whenever the layout changes,
+# older files are then refused
+FORMAT_VERSION = 2
+MAGIC = b"T2TB"
+
+# magic, version, node count, string count
+HEADER = struct.Struct("<4sHxxII")
+
+# sections after the header, each padded to 8 bytes,
+# counts are "nodes" or "strings", parents are derived
+# from the children and labels are a base string plus
+# a postfix, so the string table holds few strings
+SECTIONS = (("offsets", "I", "strings"),
+            ("value", "d", "nodes"),
+            ("purity", "d", "nodes"),
+            ("examples", "i", "nodes"),
+            ("attr", "i", "nodes"),
+            ("postfix", "i", "nodes"),
+            ("orig", "i", "nodes"),
+            ("left", "i", "nodes"),
+            ("right", "i", "nodes"),
+            ("op", "b", "nodes"))
+
+def _padding(size):
+    return -size % 8
+
+# string table class
+# decodes strings from a buffer on access
+class String_Table:
+    def __init__(self, offsets, data):
+        ''' Parameters
+            ----------
+            self: String Table object
+            offsets: start of each string plus the end
+                     of the last one as integer sequence
+            data: utf-8 bytes of all strings as buffer
+
+            Returns
+            -------
+            None
+        '''
+        self.offsets = offsets
+        self.data = data
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        return str(self.data[self.offsets[i]:self.offsets[i + 1]], "utf-8")
+
+# label map class
+# orig_labels read through the node table
+class Label_Map(Mapping):
+    def __init__(self, tree):
+        ''' Parameters
+            ----------
+            self: Label Map object
+            tree: compact tree object, each node holds
+                  its label and original label
+
+            Returns
+            -------
+            None
+        '''
+        self.tree = tree
+
+    def __len__(self):
+        return len(self.tree)
+
+    def __iter__(self):
+        return (self.tree.label(i) for i in range(len(self.tree)))
+
+    def __getitem__(self, key):
+        i = self.tree.find(key)
+        if i < 0:
+            raise KeyError(key)
+        return self.tree.strings[self.tree.orig[i]]
+
+# write a parsed tree to an open file
+def dump(table, file_out):
+    ''' Parameters
+        ----------
+        table: tree from Tanagra_Parser.to_table
+        file_out: file object opened for binary writing
+
+        Returns
+        -------
+        None, labels missing from the tree are not kept
+    '''
+    attrs, ops, values, left, right, orig_labels, examples, purity = table
+    n = len(attrs)
+
+    # labels and original labels share one string table
+    strings, string_ids = [], {}
+    def intern(s):
+        if s not in string_ids:
+            string_ids[s] = len(strings)
+            strings.append(s)
+        return string_ids[s]
+
+    split = [c.split_label(a) for a in attrs]
+    arrays = {"value": array("d", (float("nan") if v is None else v for v in values)),
+              "purity": array("d", (float("nan") if p is None else p for p in purity)),
+              "examples": array("i", (-1 if e is None else e for e in examples)),
+              "attr": array("i", (intern(base) for base, postfix in split)),
+              "postfix": array("i", (postfix for base, postfix in split)),
+              "orig": array("i", (intern(orig_labels.get(a, a)) for a in attrs)),
+              "left": array("i", left),
+              "right": array("i", right),
+              "op": array("b", (c.OP_CODES[op] for op in ops))}
+
+    encoded = [s.encode("utf-8") for s in strings]
+    offsets = array("I", [0])
+    for s in encoded:
+        offsets.append(offsets[-1] + len(s))
+    arrays["offsets"] = offsets
+
+    file_out.write(HEADER.pack(MAGIC, FORMAT_VERSION, n, len(strings)))
+    for name, code, count in SECTIONS:
+        a = arrays[name]
+        if sys.byteorder == "big": a.byteswap()
+        data = a.tobytes()
+        file_out.write(data + bytes(_padding(len(data))))
+    file_out.write(b"".join(encoded))
+
+# write a parsed tree
+def write(file_name, table):
+    ''' Parameters
+        ----------
+        file_name: path/name of file to write as string
+        table: tree from Tanagra_Parser.to_table
+
+        Returns
+        -------
+        None, labels missing from the tree are not kept
+    '''
+    # write then rename so readers never
+    # see a partially written file
+    directory = os.path.dirname(os.path.abspath(file_name))
+    fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as file_out:
+            dump(table, file_out)
+        os.replace(tmp, file_name)
+    except BaseException:
+        os.remove(tmp)
+        raise
+
+# read a tree from a buffer holding what dump wrote
+def loads(buf, name="buffer"):
+    ''' Parameters
+        ----------
+        buf: bytes, mmap or other buffer
+        name: name of the buffer for error messages
+
+        Returns
+        -------
+        (compact tree, orig_labels) tuple over the buffer,
+        close the tree to release it
+    '''
+    view = memoryview(buf)
+    if len(view) < HEADER.size:
+        raise ValueError("{0} is not a tana2tree binary file".format(name))
+    magic, version, n, n_strings = HEADER.unpack_from(view)
+    if magic != MAGIC:
+        raise ValueError("{0} is not a tana2tree binary file".format(name))
+    if version != FORMAT_VERSION:
+        raise ValueError("{0} has format version {1}, expected {2}".format(name, version, FORMAT_VERSION))
+
+    counts = {"nodes": n, "strings": n_strings + 1}
+    arrays, pos = {}, HEADER.size
+    for section_name, code, count in SECTIONS:
+        size = counts[count] * struct.calcsize(code)
+        if pos + size > len(view):
+            raise ValueError("{0} is truncated".format(name))
+        section = view[pos:pos + size]
+        if sys.byteorder == "big":
+            section = array(code, section.tobytes())
+            section.byteswap()
+        else:
+            section = section.cast(code)
+        arrays[section_name] = section
+        pos = pos + size + _padding(size)
+
+    strings = String_Table(arrays["offsets"], view[pos:])
+    if len(view) - pos < arrays["offsets"][-1]:
+        raise ValueError("{0} is truncated".format(name))
+
+    # views must be released before the map closes
+    def close():
+        for section in arrays.values():
+            if isinstance(section, memoryview): section.release()
+        strings.data.release()
+        view.release()
+        if isinstance(buf, mmap.mmap): buf.close()
+
+    tree = c.Compact_Tree.from_arrays(strings, arrays["attr"], arrays["postfix"], arrays["orig"], arrays["op"],
+                                      arrays["value"], arrays["left"], arrays["right"],
+                                      arrays["examples"], arrays["purity"], close)
+    return tree, Label_Map(tree)
+
+# read a tree written by write
+def read(file_name, use_mmap=True):
+    ''' Parameters
+        ----------
+        file_name: path/name of file to read as string
+        use_mmap: map the file instead of reading it, node
+                  fields are then read from the page cache
+
+        Returns
+        -------
+        (compact tree, orig_labels) tuple, no Python
+        objects are built per node, close the tree to
+        unmap the file
+    '''
+    with open(file_name, "rb") as file_in:
+        if use_mmap and os.fstat(file_in.fileno()).st_size:
+            buf = mmap.mmap(file_in.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            buf = file_in.read()
+    return loads(buf, file_name)
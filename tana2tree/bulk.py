@@ -0,0 +1,136 @@
+# Author:   Bradley Reeves <bradleyaaronreeves@gmail.com>
+# Date:     October 18, 2020
+# About:    Converts a Tanagra tree description from HTML
+#           to a usable format.
+
+from concurrent.futures import ProcessPoolExecutor
+import argparse
+import glob
+import os
+import tana2tree.tana2tree as t2t
+
+# bulk result class
+# outcome of parsing one report
+class Bulk_Result:
+    def __init__(self, path, table, error):
+        ''' Parameters
+            ----------
+            self: Bulk Result object
+            path: path/name of report as string
+            table: tree from Tanagra_Parser.to_table, None on failure
+            error: error message as string, None on success
+
+            Returns
+            -------
+            None
+        '''
+        self.path = path
+        self.table = table
+        self.error = error
+
+    def __repr__(self):
+        if self.error:
+            return "Bulk_Result({0!r}, error={1!r})".format(self.path, self.error)
+        return "Bulk_Result({0!r}, nodes={1})".format(self.path, len(self.table[0]))
+
+    # rebuild the parsed tree
+    def to_parser(self):
+        ''' Parameters
+            ----------
+            self: Bulk Result object
+
+            Returns
+            -------
+            tanagra parser object holding the tree
+        '''
+        if self.error:
+            raise ValueError("{0} failed to parse: {1}".format(self.path, self.error))
+        parser = t2t.Tanagra_Parser()
+        parser.from_table(self.table)
+        return parser
+
+# parse one report, runs in a worker
+def parse_file(path):
+    ''' Parameters
+        ----------
+        path: path/name of report as string
+
+        Returns
+        -------
+        (path, table, error) tuple, a flat table
+        pickles far smaller than a node graph
+    '''
+    try:
+        parser = t2t.Tanagra_Parser()
+        parser.parse(path)
+        return path, parser.to_table(), None
+    except Exception as e:
+        return path, None, "{0}: {1}".format(type(e).__name__, e)
+
+# expand a directory or glob into report paths
+def find_reports(source, pattern="*.txt"):
+    ''' Parameters
+        ----------
+        source: directory, glob pattern or list of paths,
+                as string or path object
+        pattern: file pattern used inside a directory as string
+
+        Returns
+        -------
+        report paths as sorted list
+    '''
+    if isinstance(source, os.PathLike):
+        source = os.fspath(source)
+    if not isinstance(source, str):
+        return list(source)
+    if os.path.isdir(source):
+        source = os.path.join(source, pattern)
+    return sorted(glob.glob(source))
+
+# parse many reports across processes
+def parse_many(source, workers=None, chunksize=1, pattern="*.txt"):
+    ''' Parameters
+        ----------
+        source: directory, glob pattern or list of paths
+        workers: number of worker processes, cpu count when None
+                 and no pool at all when 1
+        chunksize: number of reports sent to a worker at once
+        pattern: file pattern used inside a directory as string
+
+        Returns
+        -------
+        list of Bulk Result objects in submission order,
+        failed reports carry an error instead of a table
+    '''
+    paths = find_reports(source, pattern)
+    if workers == 1:
+        return [Bulk_Result(*r) for r in map(parse_file, paths)]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return [Bulk_Result(*r) for r in executor.map(parse_file, paths, chunksize=chunksize)]
+
+def main(argv=None):
+    ''' Parameters
+        ----------
+        argv: command line arguments as list, sys.argv when None
+
+        Returns
+        -------
+        exit status, 1 when any report failed
+    '''
+    args = argparse.ArgumentParser(description="Parse many Tanagra reports in parallel.")
+    args.add_argument("source", help="directory or glob of reports")
+    args.add_argument("-w", "--workers", type=int, default=None, help="worker processes (default: cpu count)")
+    args.add_argument("-c", "--chunksize", type=int, default=1, help="reports sent to a worker at once")
+    args.add_argument("-p", "--pattern", default="*.txt", help="file pattern inside a directory")
+    args = args.parse_args(argv)
+
+    results = parse_many(args.source, args.workers, args.chunksize, args.pattern)
+    failed = 0
+    for result in results:
+        if result.error:
+            failed = failed + 1
+            print("{0}: FAILED {1}".format(result.path, result.error))
+        else:
+            print("{0}: {1} nodes".format(result.path, len(result.table[0])))
+    print("{0} parsed, {1} failed".format(len(results) - failed, failed))
+    return 1 if failed else 0
@@ -0,0 +1,222 @@
+# Author:   Bradley Reeves <bradleyaaronreeves@gmail.com>
+# Date:     October 18, 2020
+# About:    Converts a Tanagra tree description from HTML
+#           to a usable format.
+
+import hashlib
+import io
+import os
+import tempfile
+import tana2tree.binary as bn
+
+# bump whenever parse output or the entry
+# format changes, older entries then never match
+CACHE_VERSION = 5
+MAGIC = b"T2TC"
+SUFFIX = ".t2tc"
+
+# parse cache class
+# stores parsed trees by content hash
+class Parse_Cache:
+    def __init__(self, directory, max_bytes=64 * 1024 * 1024):
+        ''' Parameters
+            ----------
+            self: Parse Cache object
+            directory: cache directory as string, created if missing
+            max_bytes: total entry size kept before the least
+                       recently used entries are evicted
+
+            Returns
+            -------
+            None
+        '''
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+        os.makedirs(directory, exist_ok=True)
+
+        # total entry size, kept up to date by store and
+        # refreshed by every scan of the directory
+        self.total = 0
+        self.evict()
+
+    # cache file for the given report bytes
+    def path(self, data):
+        ''' Parameters
+            ----------
+            self: Parse Cache object
+            data: report contents as bytes
+
+            Returns
+            -------
+            path of cache entry as string
+        '''
+        digest = hashlib.sha256(data).hexdigest()
+        return os.path.join(self.directory, "{0}-v{1}{2}".format(digest, CACHE_VERSION, SUFFIX))
+
+    # parse through the cache
+    def parse(self, parser, input_file):
+        ''' Parameters
+            ----------
+            self: Parse Cache object
+            parser: tanagra parser object to fill
+            input_file: tanagra description
+
+            Returns
+            -------
+            root node of tree
+        '''
+        with open(input_file, "rb") as file_in:
+            data = file_in.read()
+        path = self.path(data)
+
+        table = self.load(path)
+        if table is not None:
+            self.hits = self.hits + 1
+            return parser.from_table(table)
+
+        # decode the same way open() does
+        self.misses = self.misses + 1
+        root = parser.parse_text(io.TextIOWrapper(io.BytesIO(data)).read())
+        self.store(path, parser.to_table())
+        return root
+
+    # read a cache entry
+    def load(self, path):
+        ''' Parameters
+            ----------
+            self: Parse Cache object
+            path: path of cache entry as string
+
+            Returns
+            -------
+            tree table, None when missing or unreadable
+        '''
+        # entries hold the binary format, plain arrays
+        # so a shared directory can not run code on load
+        try:
+            with open(path, "rb") as file_in:
+                if file_in.read(len(MAGIC)) != MAGIC or file_in.read(2) != CACHE_VERSION.to_bytes(2, "little"):
+                    raise ValueError("stale cache entry")
+                data = file_in.read()
+            tree, _ = bn.loads(data, path)
+            with tree:
+                table = tree.to_table()
+            check_table(table)
+        except FileNotFoundError:
+            return None
+        except Exception:
+            # drop broken entries
+            self.remove(path)
+            return None
+
+        # mark as recently used
+        os.utime(path)
+        return table
+
+    # write a cache entry, evict when over max_bytes
+    def store(self, path, table):
+        ''' Parameters
+            ----------
+            self: Parse Cache object
+            path: path of cache entry as string
+            table: tree from Tanagra_Parser.to_table
+
+            Returns
+            -------
+            None
+        '''
+        # write then rename so readers never
+        # see a partially written entry
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "wb") as file_out:
+            file_out.write(MAGIC)
+            file_out.write(CACHE_VERSION.to_bytes(2, "little"))
+            bn.dump(table, file_out)
+            size = file_out.tell()
+        os.replace(tmp, path)
+        self.writes = self.writes + 1
+
+        # a replaced entry is counted twice until
+        # the next scan, which only evicts early
+        self.total = self.total + size
+        if self.total > self.max_bytes:
+            self.evict()
+
+    # delete a cache entry if present
+    def remove(self, path):
+        ''' Parameters
+            ----------
+            self: Parse Cache object
+            path: path of cache entry as string
+
+            Returns
+            -------
+            None
+        '''
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    # scan the directory and drop least
+    # recently used entries over max_bytes
+    def evict(self):
+        ''' Parameters
+            ----------
+            self: Parse Cache object
+
+            Returns
+            -------
+            None
+        '''
+        entries, total = [], 0
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(SUFFIX):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+                total = total + stat.st_size
+
+        for mtime, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            self.remove(path)
+            total = total - size
+            self.evictions = self.evictions + 1
+        self.total = total
+
+    # export counters
+    def stats(self):
+        ''' Parameters
+            ----------
+            self: Parse Cache object
+
+            Returns
+            -------
+            counters as dict
+        '''
+        return {"hits": self.hits, "misses": self.misses,
+                "writes": self.writes, "evictions": self.evictions}
+
+# check the node links of a loaded table
+def check_table(table):
+    ''' Parameters
+        ----------
+        table: tree as read from a cache entry
+
+        Returns
+        -------
+        None, raises ValueError when children are not
+        in the table after their parent, as
+        Tanagra_Parser.from_table needs them
+    '''
+    attrs, ops, values, left, right = table[:5]
+    n = len(attrs)
+    if not n:
+        raise ValueError("cache entry holds no tree")
+    for i, (l, r) in enumerate(zip(left, right)):
+        if not (l == -1 or i < l < n) or not (r == -1 or i < r < n):
+            raise ValueError("cache entry has a broken node link")
@@ -0,0 +1,112 @@
+# Author:   Bradley Reeves <bradleyaaronreeves@gmail.com>
+# Date:     October 18, 2020
+# About:    Converts a Tanagra tree description from HTML
+#           to a usable format.
+
+import functools
+
+# python allows 100 indent levels,
+# keep room for the function body
+MAX_DEPTH = 90
+
+# return python source scoring the tree
+def make_source(root, orig_labels, features, func_name="predict", visits=False):
+    ''' Parameters
+        ----------
+        root: root node of tree
+        orig_labels: dict of unique labels to original labels
+        features: column order of x as list of original attribute names
+        func_name: name of generated function as string
+        visits: also return the number of splits tested
+
+        Returns
+        -------
+        module source as string, defines FEATURES and
+        func_name(x) returning the original class label,
+        or (label, visits) tuple with visits
+    '''
+    columns = {name: i for i, name in enumerate(features)}
+    lines = ["FEATURES = {0!r}".format(list(features)),
+             "",
+             "def {0}(x):".format(func_name)]
+
+    # strings on the stack are lines
+    # waiting for their subtree
+    stack = [(root, 1)]
+    seen = set()
+    while stack:
+        node, depth = stack.pop()
+        if depth > MAX_DEPTH:
+            raise ValueError("tree deeper than {0} levels".format(MAX_DEPTH))
+        indent = "    " * depth
+
+        if isinstance(node, str):
+            lines.append(indent + node)
+            continue
+
+        # a label on two nodes could only map to one of their names
+        if node.attr in seen:
+            raise ValueError("label {0} names more than one node".format(node.attr))
+        seen.add(node.attr)
+
+        if node.op is None:
+            label = repr(orig_labels[node.attr])
+            lines.append(indent + "return " + ("{0}, {1}".format(label, depth - 1) if visits else label))
+        elif not node.l_branch or not node.r_branch:
+            raise ValueError("node {0} is missing a branch".format(node.attr))
+        else:
+            name = orig_labels[node.attr]
+            if name not in columns:
+                raise ValueError("features missing tree attribute: {0}".format(name))
+            lines.append(indent + "if x[{0}] < {1!r}:".format(columns[name], node.value))
+            stack.append((node.r_branch, depth + 1))
+            stack.append(("else:", depth))
+            stack.append((node.l_branch, depth + 1))
+
+    return "\n".join(lines) + "\n"
+
+# compile generated source into a function,
+# the same source is only compiled once
+@functools.lru_cache(maxsize=128)
+def compile_source(source, func_name="predict"):
+    ''' Parameters
+        ----------
+        source: source from make_source as string
+        func_name: name of generated function as string
+
+        Returns
+        -------
+        scoring function, its features attribute
+        holds the column order of x
+    '''
+    namespace = {}
+    exec(compile(source, "<tana2tree>", "exec"), namespace)
+    func = namespace[func_name]
+    func.features = namespace["FEATURES"]
+    return func
+
+# time every call of a scoring function
+def profiled(func, profiler):
+    ''' Parameters
+        ----------
+        func: function from compile_source generated
+              with visits, returning (label, visits)
+        profiler: profiler object recording each row
+                  as stage "score"
+
+        Returns
+        -------
+        function returning the label alone, with the
+        same features attribute
+    '''
+    def predict(x):
+        depth = profiler.start("score")
+        try:
+            label, visits = func(x)
+        except BaseException:
+            profiler.stop(depth=depth)
+            raise
+        profiler.stop(rows=1, visits=visits, depth=depth)
+        return label
+    predict.features = func.features
+    return predict
@@ -0,0 +1,300 @@
+# Author:   Bradley Reeves <bradleyaaronreeves@gmail.com>
+# Date:     October 18, 2020
+# About:    Converts a Tanagra tree description from HTML
+#           to a usable format.
+
+import csv
+import os
+import numpy as np
+import tana2tree.predict as p
+
+# import an optional dependency
+def _require(module, purpose):
+    try:
+        return __import__(module, fromlist=["_"])
+    except ImportError:
+        raise ImportError("{0} requires {1}".format(purpose, module.split(".")[0])) from None
+
+# names of the columns of a frame or batch
+def column_names(data):
+    ''' Parameters
+        ----------
+        data: pandas DataFrame, pyarrow Table or RecordBatch,
+              or mapping of names to columns
+
+        Returns
+        -------
+        column names as list
+    '''
+    if hasattr(data, "column_names"):
+        return list(data.column_names)
+    if hasattr(data, "columns"):
+        return list(data.columns)
+    return list(data.keys())
+
+# one column as a float array
+def column_values(data, name):
+    ''' Parameters
+        ----------
+        data: see column_names
+        name: column name as string
+
+        Returns
+        -------
+        column as 1-D float64 numpy array, nulls become nan
+    '''
+    if hasattr(data, "column_names"):
+        # arrow columns are cast without going through pandas
+        return _arrow_values(data.column(name).cast("float64"))
+    column = data[name]
+    if hasattr(column, "to_numpy"):
+        return column.to_numpy(dtype=np.float64, na_value=np.nan)
+    return np.asarray(column, dtype=np.float64)
+
+# column scorer class
+# scores dataframes and arrow batches by column name
+class Column_Scorer:
+    def __init__(self, tree, columns=None, proba=False):
+        ''' Parameters
+            ----------
+            self: Column Scorer object
+            tree: compiled tree object, or tanagra parser
+                  object compiled in its own feature order
+            columns: dict of original attribute names to input
+                     column names where they differ, input
+                     columns are the original names otherwise
+            proba: also output one probability column per class
+
+            Returns
+            -------
+            None
+        '''
+        if not isinstance(tree, p.Compiled_Tree):
+            tree = tree.compile()
+        self.tree = tree
+        self.proba = proba
+        columns = columns or {}
+        self.columns = [columns.get(name, name) for name in tree.features]
+
+    # tree attributes an input lacks
+    def missing(self, data):
+        ''' Parameters
+            ----------
+            self: Column Scorer object
+            data: frame, batch, mapping or list of column names
+
+            Returns
+            -------
+            input column names the tree needs but data
+            does not have as list, empty when it can be scored
+        '''
+        names = set(data if isinstance(data, (list, tuple, set)) else column_names(data))
+        return [name for name in self.columns if name not in names]
+
+    # names of the scored columns
+    def output_columns(self):
+        ''' Parameters
+            ----------
+            self: Column Scorer object
+
+            Returns
+            -------
+            output column names of score as list
+        '''
+        names = ["prediction"]
+        if self.proba:
+            names.extend("proba_{0}".format(c) for c in self.tree.classes)
+        return names
+
+    # fail before reading anything when columns are missing
+    def check(self, data):
+        ''' Parameters
+            ----------
+            self: Column Scorer object
+            data: see missing
+
+            Returns
+            -------
+            None, raises ValueError naming every missing column
+        '''
+        missing = self.missing(data)
+        if missing:
+            raise ValueError("input is missing tree attributes: {0}".format(missing))
+
+    # score one frame or batch
+    def score(self, data):
+        ''' Parameters
+            ----------
+            self: Column Scorer object
+            data: pandas DataFrame, pyarrow Table or RecordBatch,
+                  or mapping of names to columns
+
+            Returns
+            -------
+            dict of output column name to numpy array, the
+            prediction and, with proba, one "proba_<class>"
+            column per class
+        '''
+        self.check(data)
+        X = np.column_stack([column_values(data, name) for name in self.columns])
+        out = {}
+        if self.proba:
+            leaves = self.tree.apply(X)
+            out["prediction"] = self.tree.classes[self.tree.leaf_class[leaves]]
+            for j, name in enumerate(self.output_columns()[1:]):
+                out[name] = self.tree.leaf_proba[leaves, j]
+        else:
+            out["prediction"] = self.tree.predict(X)
+        return out
+
+    # score a stream of frames or batches
+    def score_batches(self, batches, keep=()):
+        ''' Parameters
+            ----------
+            self: Column Scorer object
+            batches: iterable of frames or batches, see score
+            keep: input column names copied to the output,
+                  e.g. a row id
+
+            Returns
+            -------
+            generator of one output dict per batch, kept
+            columns first
+        '''
+        for batch in batches:
+            out = {name: _values(batch, name) for name in keep}
+            out.update(self.score(batch))
+            yield out
+
+    # score a file too large for memory
+    def score_file(self, input_file, output_file, batch_size=64 * 1024, keep=()):
+        ''' Parameters
+            ----------
+            self: Column Scorer object
+            input_file: .parquet file, requires pyarrow, or .csv
+                        file, requires pandas
+            output_file: .parquet file, requires pyarrow, or .csv
+                         file, written as batches are scored
+            batch_size: rows read and scored at once, memory
+                        stays in proportion to it
+            keep: input column names copied to the output
+
+            Returns
+            -------
+            number of rows scored as integer, raises
+            ValueError naming missing columns before
+            any rows are read
+        '''
+        keep = list(keep)
+        batches = self.__read(input_file, batch_size, keep)
+        rows = 0
+        with _Writer(output_file, keep + self.output_columns()) as writer:
+            for out in self.score_batches(batches, keep):
+                writer.write(out)
+                rows = rows + len(out["prediction"])
+        return rows
+
+    # stream the needed columns of a file
+    def __read(self, input_file, batch_size, keep):
+        ''' Parameters
+            ----------
+            self: Column Scorer object
+            input_file: see score_file
+            batch_size: rows per batch as integer
+            keep: input column names copied to the output
+
+            Returns
+            -------
+            iterable of frames or record batches
+        '''
+        wanted = list(dict.fromkeys(self.columns + keep))
+        extension = os.path.splitext(input_file)[1].lower()
+        if extension == ".parquet":
+            pq = _require("pyarrow.parquet", "reading parquet")
+            source = pq.ParquetFile(input_file)
+            self.check(source.schema_arrow.names)
+            _check_keep(keep, source.schema_arrow.names)
+            return source.iter_batches(batch_size=batch_size, columns=wanted)
+        if extension == ".csv":
+            pd = _require("pandas", "reading csv")
+            names = list(pd.read_csv(input_file, nrows=0).columns)
+            self.check(names)
+            _check_keep(keep, names)
+            return pd.read_csv(input_file, usecols=wanted, chunksize=batch_size)
+        raise ValueError("input must be a .parquet or .csv file, not {0}".format(input_file))
+
+# kept columns must exist
+def _check_keep(keep, names):
+    missing = [name for name in keep if name not in names]
+    if missing:
+        raise ValueError("input is missing kept columns: {0}".format(missing))
+
+# one kept column as it is
+def _values(data, name):
+    if hasattr(data, "column_names"):
+        return _arrow_values(data.column(name))
+    return np.asarray(data[name])
+
+# arrow array or table column as a numpy array
+def _arrow_values(column):
+    if hasattr(column, "combine_chunks"):
+        column = column.combine_chunks()
+    return column.to_numpy(zero_copy_only=False)
+
+# writer class
+# appends output batches to a csv or parquet file
+class _Writer:
+    def __init__(self, file_name, names):
+        ''' Parameters
+            ----------
+            self: Writer object
+            file_name: .parquet or .csv file to write as string
+            names: output column names, a csv file gets
+                   its header even when no rows follow
+
+            Returns
+            -------
+            None
+        '''
+        self.file_name = file_name
+        self.extension = os.path.splitext(file_name)[1].lower()
+        if self.extension not in (".parquet", ".csv"):
+            raise ValueError("output must be a .parquet or .csv file, not {0}".format(file_name))
+        if self.extension == ".parquet":
+            self.pa = _require("pyarrow", "writing parquet")
+            self.pq = _require("pyarrow.parquet", "writing parquet")
+        self.file_out = None
+        self.writer = None
+        if self.extension == ".csv":
+            self.file_out = open(file_name, "w", newline="")
+            self.writer = csv.writer(self.file_out)
+            self.writer.writerow(names)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        if self.writer is not None and self.extension == ".parquet":
+            self.writer.close()
+        if self.file_out is not None:
+            self.file_out.close()
+
+    # append one batch
+    def write(self, out):
+        ''' Parameters
+            ----------
+            self: Writer object
+            out: dict of column name to numpy array
+
+            Returns
+            -------
+            None
+        '''
+        if self.extension == ".parquet":
+            table = self.pa.table(out)
+            if self.writer is None:
+                self.writer = self.pq.ParquetWriter(self.file_name, table.schema)
+            self.writer.write_table(table)
+            return
+
+        self.writer.writerows(zip(*(column.tolist() for column in out.values())))
@@ -0,0 +1,311 @@
+# Author:   Bradley Reeves <bradleyaaronreeves@gmail.com>
+# Date:     October 18, 2020
+# About:    Converts a Tanagra tree description from HTML
+#           to a usable format.
+
+from array import array
+import re
+import tana2tree.tree as t
+
+# operator codes stored per node
+OPS = (None, "<", ">=")
+OP_CODES = {op: i for i, op in enumerate(OPS)}
+
+# postfix the labeller adds, short enough for an int32
+POSTFIX = re.compile("[1-9][0-9]{0,8}")
+
+# label as (base, postfix), "ccm_2" gives ("ccm", 2)
+# so postfixed labels share the string of their base
+def split_label(label):
+    ''' Parameters
+        ----------
+        label: unique label as string
+
+        Returns
+        -------
+        (base, postfix) tuple, postfix 0 when the label
+        does not end in one that joins back the same way
+    '''
+    base, sep, tail = label.rpartition("_")
+    if base and POSTFIX.fullmatch(tail):
+        return base, int(tail)
+    return label, 0
+
+# compact tree class
+# node fields in typed arrays by node id
+class Compact_Tree:
+    def __init__(self, table):
+        ''' Parameters
+            ----------
+            self: Compact Tree object
+            table: tree from Tanagra_Parser.to_table
+
+            Returns
+            -------
+            None
+        '''
+        attrs, ops, values, left, right, orig_labels, examples, purity = table
+
+        # labels and original labels share
+        # one interned string table
+        self.strings = []
+        string_ids = {}
+        def intern(s):
+            if s not in string_ids:
+                string_ids[s] = len(self.strings)
+                self.strings.append(s)
+            return string_ids[s]
+
+        self.attr, self.postfix = array("i"), array("i")
+        for a in attrs:
+            base, postfix = split_label(a)
+            self.attr.append(intern(base))
+            self.postfix.append(postfix)
+        self.orig = array("i", (intern(orig_labels.get(a, a)) for a in attrs))
+        self.op = array("b", (OP_CODES[op] for op in ops))
+        self.value = array("d", (float("nan") if v is None else v for v in values))
+        self.left = array("i", left)
+        self.right = array("i", right)
+        self.examples = array("q", (-1 if e is None else e for e in examples))
+        self.purity = array("d", (float("nan") if p is None else p for p in purity))
+
+        # label to node id and parent ids,
+        # built on first use
+        self.__index = None
+        self.__parent = None
+        self.__close = None
+
+    # compact tree over arrays read elsewhere
+    @classmethod
+    def from_arrays(cls, strings, attr, postfix, orig, op, value, left, right, examples, purity, close=None):
+        ''' Parameters
+            ----------
+            cls: Compact Tree class
+            strings: string table indexed by string id
+            attr, postfix: string ids of label bases and label
+                           postfixes, see split_label
+            orig: string ids of original labels
+            op: operator codes, see OPS
+            value: thresholds, NaN for leaves
+            left, right: node ids, -1 when missing
+            examples: training examples, -1 when unknown
+            purity: majority class shares, NaN when unknown
+            close: function releasing the arrays, called
+                   once by close
+
+            Returns
+            -------
+            Compact Tree object using the arrays as they are
+        '''
+        tree = cls.__new__(cls)
+        tree.strings = strings
+        tree.attr, tree.postfix, tree.orig, tree.op, tree.value = attr, postfix, orig, op, value
+        tree.left, tree.right = left, right
+        tree.examples, tree.purity = examples, purity
+        tree.__index = None
+        tree.__parent = None
+        tree.__close = close
+        return tree
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # release the arrays, e.g. unmap a loaded file
+    def close(self):
+        ''' Parameters
+            ----------
+            self: Compact Tree object
+
+            Returns
+            -------
+            None, the tree and its node views can not be
+            read afterwards when it was read from a file
+        '''
+        if self.__close is not None:
+            self.__index = self.__parent = None
+            close, self.__close = self.__close, None
+            close()
+
+    def __len__(self):
+        ''' Parameters
+            ----------
+            self: Compact Tree object
+
+            Returns
+            -------
+            number of nodes as integer
+        '''
+        return len(self.attr)
+
+    # root node view
+    @property
+    def root(self):
+        return Node_View(self, 0)
+
+    # parent node ids, -1 for the root
+    @property
+    def parent(self):
+        if self.__parent is None:
+            parent = array("i", [-1]) * len(self)
+            for i, (l, r) in enumerate(zip(self.left, self.right)):
+                if l >= 0: parent[l] = i
+                if r >= 0: parent[r] = i
+            self.__parent = parent
+        return self.__parent
+
+    # unique label of a node
+    def label(self, i):
+        ''' Parameters
+            ----------
+            self: Compact Tree object
+            i: node id as integer
+
+            Returns
+            -------
+            label as string
+        '''
+        postfix = self.postfix[i]
+        base = self.strings[self.attr[i]]
+        return base + "_" + str(postfix) if postfix else base
+
+    # node id of a label
+    def find(self, attr):
+        ''' Parameters
+            ----------
+            self: Compact Tree object
+            attr: node label as string
+
+            Returns
+            -------
+            node id as integer, -1 when missing
+        '''
+        if self.__index is None:
+            self.__index = {self.label(i): i for i in range(len(self))}
+        return self.__index.get(attr, -1)
+
+    # original labels of every node label
+    def orig_labels(self):
+        ''' Parameters
+            ----------
+            self: Compact Tree object
+
+            Returns
+            -------
+            dict of unique labels to original labels
+        '''
+        return {self.label(i): self.strings[o] for i, o in enumerate(self.orig)}
+
+    # tree as plain lists, node ids are kept
+    def to_table(self):
+        ''' Parameters
+            ----------
+            self: Compact Tree object
+
+            Returns
+            -------
+            tree as Tanagra_Parser.to_table gives it
+        '''
+        return ([self.label(i) for i in range(len(self))],
+                [OPS[o] for o in self.op],
+                [None if v != v else v for v in self.value],
+                list(self.left), list(self.right), self.orig_labels(),
+                [e if e >= 0 else None for e in self.examples],
+                [None if p != p else p for p in self.purity])
+
+# node view class
+# Tree_Node interface over a compact tree
+class Node_View(t.Tree_Node):
+    __slots__ = ("tree", "id")
+
+    def __init__(self, tree, id):
+        ''' Parameters
+            ----------
+            self: Node View object
+            tree: compact tree object
+            id: node id as integer
+
+            Returns
+            -------
+            None
+        '''
+        self.tree = tree
+        self.id = id
+
+    def __eq__(self, other):
+        return isinstance(other, Node_View) and self.tree is other.tree and self.id == other.id
+
+    def __hash__(self):
+        return hash((id(self.tree), self.id))
+
+    def __repr__(self):
+        return "<Node_View {0!r} of {1}>".format(self.attr, self.tree)
+
+    @property
+    def attr(self):
+        return self.tree.label(self.id)
+
+    @property
+    def op(self):
+        return OPS[self.tree.op[self.id]]
+
+    @property
+    def value(self):
+        return None if self.tree.op[self.id] == 0 else self.tree.value[self.id]
+
+    @property
+    def examples(self):
+        e = self.tree.examples[self.id]
+        return e if e >= 0 else None
+
+    @property
+    def purity(self):
+        p = self.tree.purity[self.id]
+        return None if p != p else p
+
+    @property
+    def l_branch(self):
+        i = self.tree.left[self.id]
+        return Node_View(self.tree, i) if i >= 0 else None
+
+    @property
+    def r_branch(self):
+        i = self.tree.right[self.id]
+        return Node_View(self.tree, i) if i >= 0 else None
+
+    @property
+    def parent(self):
+        i = self.tree.parent[self.id]
+        return self.tree.label(i) if i >= 0 else None
+
+    @property
+    def parent_op(self):
+        i = self.tree.parent[self.id]
+        if i < 0: return None
+        return "<" if self.tree.left[i] == self.id else ">="
+
+    # return node object from compact tree
+    def get_node(self, root, attr):
+        ''' Parameters
+            ----------
+            self: Node View object
+            root: root node of tree
+            attr: target node attr as string
+
+            Returns
+            -------
+            node: target node object as list
+        '''
+        node = []
+        if root:
+            i = root.tree.find(attr)
+            if i >= 0: node.append(Node_View(root.tree, i))
+        return node
+
+    def insert(self, parent, parent_op, attr, op, value):
+        raise TypeError("compact trees are read only")
+
+    def add_child(self, parent_op, attr, op, value):
+        raise TypeError("compact trees are read only")
@@ -0,0 +1,219 @@
+# Author:   Bradley Reeves <bradleyaaronreeves@gmail.com>
+# Date:     October 18, 2020
+# About:    Converts a Tanagra tree description from HTML
+#           to a usable format.
+
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import os
+import numpy as np
+import tana2tree.bulk as b
+import tana2tree.predict as p
+
+# compiled trees of a process pool worker
+_worker_trees = None
+
+def _init_worker(trees):
+    global _worker_trees
+    _worker_trees = trees
+
+def _score_in_worker(ids, X, classes, voting):
+    return _score(_worker_trees, ids, X, classes, voting)
+
+# summed votes or probabilities of some trees
+def _score(trees, ids, X, classes, voting):
+    ''' Parameters
+        ----------
+        trees: list of compiled tree objects
+        ids: indexes into trees to score
+        X: 2-D numpy array in forest feature order
+        classes: forest classes as sorted numpy array
+        voting: "hard" or "soft"
+
+        Returns
+        -------
+        2-D numpy array with one row per input row
+        and one column per forest class
+    '''
+    out = np.zeros((X.shape[0], len(classes)))
+    rows = np.arange(X.shape[0])
+    for i in ids:
+        tree = trees[i]
+        columns = np.searchsorted(classes, tree.classes)
+        if voting == "hard":
+            out[rows, columns[tree.leaf_class[tree.apply(X)]]] += 1.0
+        else:
+            out[:, columns] += tree.predict_proba(X)
+    return out
+
+# forest class
+# scores a batch with many trees
+class Forest:
+    def __init__(self, trees, features=None, workers=None, pool="thread", voting="hard"):
+        ''' Parameters
+            ----------
+            self: Forest object
+            trees: directory, glob pattern or list of report
+                   paths, tanagra parser or compiled tree objects
+            features: column order of 2-D input as list of original
+                      attribute names, every tree's attributes in
+                      first seen order when None
+            workers: number of pool workers, cpu count when None
+                     and no pool at all when 1
+            pool: "thread" or "process"
+            voting: "hard" for majority vote, "soft" for
+                    averaged class probabilities
+
+            Returns
+            -------
+            None
+        '''
+        if pool not in ("thread", "process"):
+            raise ValueError("pool must be 'thread' or 'process'")
+        self.__check_voting(voting)
+        self.workers = workers
+        self.pool = pool
+        self.voting = voting
+        self.__executor = None
+
+        # parse reports given by path across processes
+        if isinstance(trees, str):
+            trees = b.find_reports(trees)
+        trees = list(trees)
+        paths = [tree for tree in trees if isinstance(tree, str)]
+        if paths:
+            results = {r.path: r for r in b.parse_many(paths, workers)}
+            failed = [r for r in results.values() if r.error]
+            if failed:
+                raise ValueError("{0} failed to parse: {1}".format(failed[0].path, failed[0].error))
+            trees = [results[tree].to_parser() if isinstance(tree, str) else tree for tree in trees]
+        if not trees:
+            raise ValueError("a forest needs at least one tree")
+
+        # one column per original attribute name
+        # shared by every tree
+        if features is None:
+            features = []
+            for tree in trees:
+                for name in tree.features if isinstance(tree, p.Compiled_Tree) else tree.get_features():
+                    if name not in features:
+                        features.append(name)
+        self.features = list(features)
+
+        # every tree reads input in the shared order
+        self.trees = []
+        for tree in trees:
+            if not isinstance(tree, p.Compiled_Tree):
+                tree = tree.compile(self.features)
+            elif tree.features != self.features:
+                raise ValueError("compiled trees must use the forest features")
+            self.trees.append(tree)
+
+        # every class any tree predicts in sorted order
+        self.classes = np.unique(np.concatenate([tree.classes for tree in self.trees]))
+
+    def __len__(self):
+        ''' Parameters
+            ----------
+            self: Forest object
+
+            Returns
+            -------
+            number of trees as integer
+        '''
+        return len(self.trees)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __check_voting(self, voting):
+        if voting not in ("hard", "soft"):
+            raise ValueError("voting must be 'hard' or 'soft'")
+
+    # pool started on first use and kept
+    def __get_executor(self):
+        if self.__executor is None:
+            if self.pool == "process":
+                self.__executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                                      initargs=(self.trees,))
+            else:
+                self.__executor = ThreadPoolExecutor(max_workers=self.workers)
+        return self.__executor
+
+    # shut down the worker pool
+    def close(self):
+        ''' Parameters
+            ----------
+            self: Forest object
+
+            Returns
+            -------
+            None
+        '''
+        if self.__executor is not None:
+            self.__executor.shutdown()
+            self.__executor = None
+
+    # summed votes or probabilities over all trees
+    def score(self, X, voting=None):
+        ''' Parameters
+            ----------
+            self: Forest object
+            X: 2-D array with columns in features order, or
+               mapping of original attribute names to columns
+            voting: "hard" or "soft", forest voting when None
+
+            Returns
+            -------
+            2-D numpy array with one row per input row
+            and one column per entry of classes
+        '''
+        voting = voting or self.voting
+        self.__check_voting(voting)
+        X = np.ascontiguousarray(self.trees[0].as_array(X))
+        if self.workers == 1:
+            return _score(self.trees, range(len(self.trees)), X, self.classes, voting)
+
+        # one task per worker so a process
+        # pool receives X once per worker
+        executor = self.__get_executor()
+        n_tasks = min(len(self.trees), self.workers or os.cpu_count() or 1)
+        chunks = [range(i, len(self.trees), n_tasks) for i in range(n_tasks)]
+        if self.pool == "process":
+            futures = [executor.submit(_score_in_worker, ids, X, self.classes, voting) for ids in chunks]
+        else:
+            futures = [executor.submit(_score, self.trees, ids, X, self.classes, voting) for ids in chunks]
+        return sum(f.result() for f in futures)
+
+    # class probabilities of each row
+    def predict_proba(self, X, voting=None):
+        ''' Parameters
+            ----------
+            self: Forest object
+            X: 2-D array or mapping of columns, see score
+            voting: "hard" gives the share of trees voting for each
+                    class, "soft" the mean of tree probabilities
+
+            Returns
+            -------
+            2-D numpy array with one row per input row
+            and one column per entry of classes
+        '''
+        return self.score(X, voting) / len(self.trees)
+
+    # predict the class of each row
+    def predict(self, X, voting=None):
+        ''' Parameters
+            ----------
+            self: Forest object
+            X: 2-D array or mapping of columns, see score
+            voting: "hard" or "soft", forest voting when None
+
+            Returns
+            -------
+            predicted original class label of each row as numpy
+            array, ties go to the first class in sorted order
+        '''
+        return self.classes[np.argmax(self.score(X, voting), axis=1)]
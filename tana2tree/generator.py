@@ -0,0 +1,164 @@
+# Author:   Bradley Reeves <bradleyaaronreeves@gmail.com>
+# Date:     October 18, 2020
+# About:    Converts a Tanagra tree description from HTML
+#           to a usable format.
+
+import random
+
+# words grouped by first letter, names built from
+# one group share the abbreviation parse() gives them
+WORDS = {
+    "a": ["area", "arc", "angle", "age", "amplitude"],
+    "c": ["concave", "curve", "color", "count", "compactness"],
+    "m": ["mean", "max", "min", "median", "mode"],
+    "p": ["points", "pixels", "pressure", "price", "perimeter"],
+    "r": ["radius", "ratio", "rate", "range", "reach"],
+    "s": ["smoothness", "symmetry", "size", "speed", "spread"],
+    "t": ["texture", "tension", "time", "tone", "torque"],
+    "w": ["worst", "width", "weight", "wave", "wear"],
+}
+
+# separators used by each naming style
+STYLES = {"underscore": "_", "hyphen": "-", "dot": ".", "space": " "}
+
+# report around the unordered list
+HEADER = ('<HTML><HEAD><style type="text/css">.BodyStyle {{color:black;font-family:Trebuchet MS;font-size:12px}}</style></HEAD>'
+          '<BODY class="BodyStyle"><FONT FACE="Trebuchet MS" SIZE=1><table width="100%"><tr><th bgcolor="#00CC99">'
+          'Supervised Learning 1 (C-RT)</th></tr></table><HR><P><H2>Classifier characteristics</H2><h3>Data description</h3>'
+          '<TABLE class="BodyStyle" cellspacing=2 cellpadding=2><TR BGCOLOR="#EFEFEF"><th>Target attribute</th>'
+          '<td>{0} ({1} values)</td></tr><TR BGCOLOR="#EFEFEF"><th># descriptors</th><td>{2}</td></tr></table>'
+          '<H4>Data partition</H4><TABLE class="BodyStyle" cellspacing=2 cellpadding=2><TR BGCOLOR="#ACCAF0"><TD>Growing set</TD>'
+          '<TD align=right width=60>{3}</TD></TR></table><H3>Tree description</H3><TABLE class="BodyStyle" cellspacing=2 cellpadding=2>'
+          '<TR BGCOLOR="#ACCAF0"><TD>Number of nodes</TD><TD align=right width=60>{4}</TD></TR><TR BGCOLOR="#ACCAF0">'
+          '<TD>Number of leaves</TD><TD align=right width=60>{5}</TD></TR></table><P><H3>Decision tree</H3>')
+FOOTER = '<HR>Computation time : 16 ms.<BR>Created at 10/10/2020 7:56:48 PM</body></html>'
+
+# make attribute names
+def make_attributes(n_attributes, style="space", collide=True, seed=0):
+    ''' Parameters
+        ----------
+        n_attributes: number of names as integer
+        style: "underscore", "hyphen", "dot", "space" or "mixed"
+        collide: reuse first letters so many names share an
+                 abbreviation, otherwise every abbreviation is unique
+        seed: random seed as integer
+
+        Returns
+        -------
+        attribute names as list
+    '''
+    rng = random.Random(seed)
+    letters = sorted(WORDS)
+    names, seen, abbrevs = [], set(), set()
+
+    # a name can only repeat after enough tries
+    tries = 0
+    while len(names) < n_attributes:
+        tries = tries + 1
+        if tries > 1000 * n_attributes:
+            raise ValueError("cannot make {0} distinct attribute names".format(n_attributes))
+
+        if collide:
+            initials = [rng.choice(letters[:3]) for _ in range(rng.randint(1, 3))]
+        else:
+            initials = [rng.choice(letters) for _ in range(rng.randint(2, 4))]
+        words = [rng.choice(WORDS[c]) for c in initials]
+
+        sep = STYLES[rng.choice(sorted(STYLES))] if style == "mixed" else STYLES[style]
+        name = sep.join(words)
+        abbrev = "".join(w[0] for w in words) if len(words) > 1 else words[0][:2]
+        if name in seen or (not collide and abbrev in abbrevs):
+            continue
+        names.append(name)
+        seen.add(name)
+        abbrevs.add(abbrev)
+    return names
+
+# make a tanagra report
+def make_report(n_leaves=None, depth=None, attributes=None, targets=("benign", "malignant"),
+                target_name="target", style="space", collide=True, skew=0.0, seed=0):
+    ''' Parameters
+        ----------
+        n_leaves: number of leaves as integer, 2 ** depth when None
+        depth: maximum depth of a leaf as integer, unbounded when None
+        attributes: attribute names as list, made with
+                    make_attributes(30, style, collide) when None
+        targets: target class names as list
+        target_name: target column name as string
+        style: naming style passed to make_attributes
+        collide: passed to make_attributes
+        skew: share of each split's examples sent down one
+              randomly chosen branch on top of the share its
+              leaves would get, 0 spreads examples evenly
+        seed: random seed as integer
+
+        Returns
+        -------
+        tanagra description as string
+    '''
+    if n_leaves is None:
+        n_leaves = 2 ** (depth if depth is not None else 3)
+    n_leaves = max(n_leaves, 2)
+    if depth is not None and n_leaves > 2 ** depth:
+        raise ValueError("{0} leaves do not fit in depth {1}".format(n_leaves, depth))
+    if attributes is None:
+        attributes = make_attributes(30, style, collide, seed)
+
+    rng = random.Random(seed)
+    examples = 10 * n_leaves
+    out = [HEADER.format(target_name, len(targets), len(attributes), examples, 2 * n_leaves - 1, n_leaves)]
+
+    # strings on the stack are written as is,
+    # tuples are subtrees still to expand
+    stack = [(n_leaves, depth, examples)]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, str):
+            out.append(item)
+            continue
+
+        n, d, ex = item
+        attr = rng.choice(attributes)
+        value = "{0:.4f}".format(rng.uniform(0, 100))
+
+        # keep both sides within the remaining depth
+        if d is None:
+            n_left = rng.randint(1, n - 1)
+        else:
+            n_left = rng.randint(max(1, n - 2 ** (d - 1)), min(n - 1, 2 ** (d - 1)))
+        share = n_left / n
+        if skew:
+            share = (1 - skew) * share + skew * rng.randint(0, 1)
+        ex_left = min(max(1, round(ex * share)), ex - 1) if ex > 1 else 1
+
+        branches = []
+        for op, bn, bex in (("<", n_left, ex_left), (">=", n - n_left, max(ex - ex_left, 1))):
+            rule = "{0} {1} {2}".format(attr, op, value)
+            if bn == 1:
+                branches.append(["<LI>{0} then {1} = <b>{2}</b> ({3:.2f} % of {4} examples)".format(
+                    rule, target_name, rng.choice(targets), rng.uniform(50, 100), bex)])
+            else:
+                branches.append(["<LI>" + rule, (bn, None if d is None else d - 1, bex)])
+
+        stack.append("</UL>")
+        for part in reversed(branches[0] + branches[1]):
+            stack.append(part)
+        stack.append("<UL>")
+
+    out.append(FOOTER)
+    return "".join(out)
+
+# write a tanagra report
+def write_report(file_name, n_leaves=None, **kwargs):
+    ''' Parameters
+        ----------
+        file_name: path/name of report to write as string
+        n_leaves: number of leaves as integer
+        kwargs: other make_report arguments
+
+        Returns
+        -------
+        None
+    '''
+    with open(file_name, "w") as file_out:
+        file_out.write(make_report(n_leaves, **kwargs))
@@ -0,0 +1,410 @@
+# Author:   Bradley Reeves <bradleyaaronreeves@gmail.com>
+# Date:     October 18, 2020
+# About:    Converts a Tanagra tree description from HTML
+#           to a usable format.
+
+import numpy as np
+
+# compiled tree class
+# scores batches of rows with numpy
+class Compiled_Tree:
+    def __init__(self, root, orig_labels, features=None, layout="level", profiler=None):
+        ''' Parameters
+            ----------
+            self: Compiled Tree object
+            root: root node of tree
+            orig_labels: dict of unique labels to original labels
+            features: column order of 2-D input as list of
+                      original attribute names, tree order when None
+            layout: "level" numbers nodes level by level, "hot"
+                    numbers them depth first with the branch seen
+                    by more training examples first
+            profiler: profiler object recording rows and node
+                      visits of each batch as stage "score"
+
+            Returns
+            -------
+            None
+        '''
+        # number the nodes level by level
+        # so each level is contiguous
+        nodes = [root]
+        i = 0
+        while i < len(nodes):
+            nodes.extend(b for b in (nodes[i].l_branch, nodes[i].r_branch) if b)
+            i = i + 1
+
+        # original attribute names used by the tree, a label
+        # on two nodes could only map to one of their names
+        names = []
+        seen = set()
+        for node in nodes:
+            if node.attr in seen:
+                raise ValueError("label {0} names more than one node".format(node.attr))
+            seen.add(node.attr)
+            if node.op is not None and orig_labels[node.attr] not in names:
+                names.append(orig_labels[node.attr])
+
+        if layout == "hot":
+            # hottest branch right after its parent, so the
+            # most visited path is nodes 0, 1, 2, ...
+            nodes, stack = [], [root]
+            while stack:
+                node = stack.pop()
+                nodes.append(node)
+                branches = [b for b in (node.r_branch, node.l_branch) if b]
+                branches.sort(key=lambda b: b.examples or 0)
+                stack.extend(branches)
+        elif layout != "level":
+            raise ValueError("layout must be 'level' or 'hot'")
+        self.layout = layout
+        self.profiler = profiler
+        self.__rules = None
+
+        ids = {node: i for i, node in enumerate(nodes)}
+        left = [ids[node.l_branch] if node.l_branch else -1 for node in nodes]
+        right = [ids[node.r_branch] if node.r_branch else -1 for node in nodes]
+
+        if features is None:
+            features = names
+        missing = [name for name in names if name not in features]
+        if missing:
+            raise ValueError("features missing tree attributes: {0}".format(missing))
+        self.features = list(features)
+        columns = {name: j for j, name in enumerate(self.features)}
+
+        # target classes in sorted order
+        self.classes = np.array(sorted(set(orig_labels[node.attr] for node in nodes if node.op is None)))
+        class_ids = {c: j for j, c in enumerate(self.classes)}
+
+        # parallel node arrays, leaves have feature -1 and
+        # branch back to themselves, internal nodes have class -1
+        n = len(nodes)
+        self.feature = np.full(n, -1, dtype=np.int32)
+        self.threshold = np.full(n, np.nan, dtype=np.float64)
+        self.left = np.array(left, dtype=np.int32)
+        self.right = np.array(right, dtype=np.int32)
+        self.leaf_class = np.full(n, -1, dtype=np.int32)
+
+        # training examples per node, -1 when unknown, and class
+        # probabilities per leaf from the majority class share
+        self.examples = np.array([-1 if node.examples is None else node.examples for node in nodes], dtype=np.int64)
+        self.leaf_proba = np.zeros((n, len(self.classes)))
+
+        for i, node in enumerate(nodes):
+            if node.op is None:
+                self.left[i] = self.right[i] = i
+                self.leaf_class[i] = class_ids[orig_labels[node.attr]]
+                if node.purity is None or len(self.classes) == 1:
+                    self.leaf_proba[i, self.leaf_class[i]] = 1.0
+                else:
+                    self.leaf_proba[i] = (1 - node.purity) / (len(self.classes) - 1)
+                    self.leaf_proba[i, self.leaf_class[i]] = node.purity
+            elif left[i] < 0 or right[i] < 0:
+                raise ValueError("node {0} is missing a branch".format(node.attr))
+            else:
+                self.feature[i] = columns[orig_labels[node.attr]]
+                self.threshold[i] = node.value
+
+        # internal nodes on the hot path
+        self.hot_depth = 0
+        if layout == "hot":
+            while self.feature[self.hot_depth] >= 0:
+                self.hot_depth = self.hot_depth + 1
+
+    def __len__(self):
+        ''' Parameters
+            ----------
+            self: Compiled Tree object
+
+            Returns
+            -------
+            number of nodes as integer
+        '''
+        return len(self.feature)
+
+    # convert input to a 2-D float array
+    def as_array(self, X):
+        ''' Parameters
+            ----------
+            self: Compiled Tree object
+            X: 2-D array with columns in features order, or
+               mapping of original attribute names to columns
+
+            Returns
+            -------
+            X as 2-D numpy array
+        '''
+        if hasattr(X, "keys"):
+            X = np.column_stack([np.asarray(X[name], dtype=np.float64) for name in self.features])
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim != 2 or X.shape[1] != len(self.features):
+            raise ValueError("expected 2-D input with {0} columns".format(len(self.features)))
+        return X
+
+    # return the leaf each row lands in
+    def apply(self, X):
+        ''' Parameters
+            ----------
+            self: Compiled Tree object
+            X: 2-D array or mapping of columns, see as_array
+
+            Returns
+            -------
+            leaf node id of each row as numpy array
+        '''
+        if self.profiler is None:
+            return self._leaves(X)[0]
+        depth = self.profiler.start("score")
+        try:
+            out, visits = self._leaves(X)
+        except BaseException:
+            self.profiler.stop(depth=depth)
+            raise
+        self.profiler.stop(rows=len(out), visits=visits, depth=depth)
+        return out
+
+    # walk rows down the tree, subclasses
+    # override this rather than apply
+    def _leaves(self, X):
+        ''' Parameters
+            ----------
+            self: Compiled Tree object
+            X: 2-D array or mapping of columns, see as_array
+
+            Returns
+            -------
+            (leaf node ids as numpy array, node visits
+            as integer) tuple
+        '''
+        X = np.ascontiguousarray(self.as_array(X))
+        out = np.zeros(X.shape[0], dtype=np.int32)
+        visits = 0
+        if self.feature[0] < 0:
+            return out, visits
+
+        # rows following the hot path finish without the
+        # general walk, the rest start where they left it
+        rows = np.arange(X.shape[0])
+        for i in range(self.hot_depth):
+            visits = visits + len(rows)
+            go_left = X[rows, self.feature[i]] < self.threshold[i]
+            leave = go_left != (self.left[i] == i + 1)
+            out[rows[leave]] = self.right[i] if self.left[i] == i + 1 else self.left[i]
+            rows = rows[~leave]
+        if self.hot_depth:
+            out[rows] = self.hot_depth
+            rows = np.flatnonzero(self.feature[out] >= 0)
+
+        # advance every unfinished row one level, rows
+        # at a leaf stay put and are dropped every few levels
+        flat = X.ravel()
+        offset = rows * X.shape[1]
+        node = out[rows]
+        level = 0
+        while rows.size:
+            visits = visits + rows.size
+            go_left = flat[offset + self.feature[node]] < self.threshold[node]
+            node = np.where(go_left, self.left[node], self.right[node])
+            level = level + 1
+            if level % 4 == 0:
+                done = self.feature[node] < 0
+                out[rows[done]] = node[done]
+                keep = ~done
+                rows, offset, node = rows[keep], offset[keep], node[keep]
+        return out, visits
+
+    # predict the class of each row
+    def predict(self, X):
+        ''' Parameters
+            ----------
+            self: Compiled Tree object
+            X: 2-D array or mapping of columns, see as_array
+
+            Returns
+            -------
+            predicted original class label of each row as numpy array
+        '''
+        return self.classes[self.leaf_class[self.apply(X)]]
+
+    # class probabilities of each row
+    def predict_proba(self, X):
+        ''' Parameters
+            ----------
+            self: Compiled Tree object
+            X: 2-D array or mapping of columns, see as_array
+
+            Returns
+            -------
+            2-D numpy array with one row per input row and
+            one column per entry of classes, the majority class
+            share of each leaf goes to its class and the rest is
+            spread over the others, all of it goes to the leaf
+            class when the report has no leaf statistics
+        '''
+        return self.leaf_proba[self.apply(X)]
+
+    # root to leaf conditions of every leaf
+    def rule_table(self):
+        ''' Parameters
+            ----------
+            self: Compiled Tree object
+
+            Returns
+            -------
+            rule table object indexed by the leaf ids apply
+            returns, built on first use and kept
+        '''
+        if self.__rules is None:
+            import tana2tree.rules as r
+            self.__rules = r.Rule_Table(self)
+        return self.__rules
+
+    # decision path of each row
+    def explain(self, X, as_text=True):
+        ''' Parameters
+            ----------
+            self: Compiled Tree object
+            X: 2-D array or mapping of columns, see as_array
+            as_text: see Rule_Table.explain
+
+            Returns
+            -------
+            rule of each row as numpy object array
+        '''
+        return self.rule_table().explain(self.apply(X), as_text)
+
+# binned tree class
+# scores rows by table lookup over threshold bins
+class Binned_Tree(Compiled_Tree):
+    def __init__(self, root, orig_labels, features=None, max_cells=1 << 20, profiler=None):
+        ''' Parameters
+            ----------
+            self: Binned Tree object
+            root: root node of tree
+            orig_labels: dict of unique labels to original labels
+            features: column order of 2-D input as list of
+                      original attribute names, tree order when None
+            max_cells: largest dense table, and the most bin
+                       combinations remembered when it is larger
+            profiler: profiler object, see Compiled_Tree
+
+            Returns
+            -------
+            None
+        '''
+        Compiled_Tree.__init__(self, root, orig_labels, features, profiler=profiler)
+        self.max_cells = max_cells
+
+        # sorted thresholds of each column the tree
+        # splits on cut that column into bins
+        internal = self.feature >= 0
+        self.columns = np.unique(self.feature[internal])
+        self.bins = [np.unique(self.threshold[internal & (self.feature == j)]) for j in self.columns]
+
+        # one cell per combination of bins, row major
+        cells = 1
+        self.strides = []
+        for edges in reversed(self.bins):
+            self.strides.insert(0, cells)
+            cells = cells * (len(edges) + 1)
+        self.cells = cells
+
+        # dense table when small, remembered combinations
+        # when the keys still fit, otherwise walk the tree,
+        # sparse tables switch to walking when combinations
+        # rarely repeat
+        self.table = None
+        self.__known = (np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int32))
+        self.__seen = self.__new = 0
+        if cells <= max_cells:
+            self.mode = "dense"
+            self.table = self.__fill_table()
+        elif cells < 2 ** 62:
+            self.mode = "sparse"
+        else:
+            self.mode = "walk"
+
+    # leaf of every cell
+    def __fill_table(self):
+        ''' Parameters
+            ----------
+            self: Binned Tree object
+
+            Returns
+            -------
+            leaf node id of every cell as flat numpy array
+        '''
+        shape = tuple(len(edges) + 1 for edges in self.bins)
+        table = np.zeros(shape, dtype=np.int32)
+        positions = {j: p for p, j in enumerate(self.columns)}
+
+        # bin range [lo, hi) of each column reaching a node,
+        # x < threshold holds for bins up to its own edge
+        stack = [(0, [0] * len(shape), list(shape))]
+        while stack:
+            node, lo, hi = stack.pop()
+            j = self.feature[node]
+            if j < 0:
+                table[tuple(slice(l, h) for l, h in zip(lo, hi))] = node
+                continue
+            p = positions[j]
+            edge = int(np.searchsorted(self.bins[p], self.threshold[node])) + 1
+            l_hi, r_lo = list(hi), list(lo)
+            l_hi[p] = min(hi[p], edge)
+            r_lo[p] = max(lo[p], edge)
+            stack.append((self.left[node], lo, l_hi))
+            stack.append((self.right[node], r_lo, hi))
+        return table.ravel()
+
+    # look up the leaf of each row
+    def _leaves(self, X):
+        ''' Parameters
+            ----------
+            self: Binned Tree object
+            X: 2-D array or mapping of columns, see as_array
+
+            Returns
+            -------
+            (leaf node ids as numpy array, node visits
+            as integer) tuple, table lookups visit none
+        '''
+        X = self.as_array(X)
+        if self.mode == "walk":
+            return Compiled_Tree._leaves(self, X)
+
+        # bin each column once and combine into a cell key
+        key = np.zeros(X.shape[0], dtype=np.int64)
+        for edges, j, stride in zip(self.bins, self.columns, self.strides):
+            key += np.searchsorted(edges, X[:, j], side="right") * stride
+        if self.mode == "dense":
+            return self.table[key], 0
+
+        # look keys up among the combinations seen so far
+        keys, leaves = self.__known
+        pos = np.minimum(np.searchsorted(keys, key), max(len(keys) - 1, 0))
+        found = keys[pos] == key if len(keys) else np.zeros(len(key), dtype=bool)
+        out = np.empty(X.shape[0], dtype=np.int32)
+        out[found] = leaves[pos[found]]
+        missing = np.flatnonzero(~found)
+        if not missing.size:
+            return out, 0
+
+        # walk one row per new combination
+        new_keys, first = np.unique(key[missing], return_index=True)
+        new_leaves, visits = Compiled_Tree._leaves(self, X[missing[first]])
+        out[missing] = new_leaves[np.searchsorted(new_keys, key[missing])]
+
+        # combinations that hardly repeat or would overflow
+        # max_cells make the table slower than walking
+        self.__seen = self.__seen + len(key)
+        self.__new = self.__new + len(new_keys)
+        if len(keys) + len(new_keys) > self.max_cells or (self.__seen >= 1000 and 2 * self.__new > self.__seen):
+            self.mode = "walk"
+            self.__known = (keys[:0], leaves[:0])
+            return out, visits
+        keys = np.concatenate((keys, new_keys))
+        leaves = np.concatenate((leaves, new_leaves))
+        order = np.argsort(keys, kind="stable")
+        self.__known = (keys[order], leaves[order])
+        return out, visits
@@ -0,0 +1,277 @@
+# Author:   Bradley Reeves <bradleyaaronreeves@gmail.com>
+# Date:     October 18, 2020
+# About:    Converts a Tanagra tree description from HTML
+#           to a usable format.
+
+import threading
+import time
+
+# fields kept per stage
+FIELDS = ("calls", "seconds", "bytes", "rows", "visits")
+
+# prometheus metric, help text and field of each export
+METRICS = (("stage_calls_total", "Times each stage ran.", "counter", "calls"),
+           ("stage_seconds_total", "Wall time spent in each stage, nested stages excluded.", "counter", "seconds"),
+           ("stage_bytes_total", "Characters of text or bytes each stage processed.", "counter", "bytes"),
+           ("stage_rows_total", "Report rules or data rows each stage handled.", "counter", "rows"),
+           ("stage_node_visits_total", "Tree nodes visited while scoring.", "counter", "visits"),
+           ("stage_rows_per_second", "Rows handled per second of stage time.", "gauge", "rows_per_second"))
+
+# stage class
+# times a block as one call of a stage
+class Stage:
+    __slots__ = ("profiler", "name", "depth", "bytes", "rows", "visits")
+
+    def __init__(self, profiler, name):
+        ''' Parameters
+            ----------
+            self: Stage object
+            profiler: profiler object to record in, None
+                      records nothing
+            name: stage name as string
+
+            Returns
+            -------
+            None
+        '''
+        self.profiler = profiler
+        self.name = name
+        self.depth = 0
+        self.bytes = self.rows = self.visits = 0
+
+    def __enter__(self):
+        if self.profiler is not None:
+            self.depth = self.profiler.start(self.name)
+        return self
+
+    def __exit__(self, *exc):
+        if self.profiler is not None:
+            self.profiler.stop(self.bytes, self.rows, self.visits, self.depth)
+
+# profiler class
+# records time, calls and sizes per stage
+class Profiler:
+    def __init__(self):
+        ''' Parameters
+            ----------
+            self: Profiler object
+
+            Returns
+            -------
+            None
+        '''
+        self.__lock = threading.Lock()
+        self.__local = threading.local()
+        self.__stages = {}
+
+    # copies sent to other processes start empty
+    def __reduce__(self):
+        return (Profiler, ())
+
+    # open stages of the calling thread
+    def __stack(self):
+        local = self.__local
+        if not hasattr(local, "stack"):
+            local.stack = []
+            local.mark = 0.0
+        return local
+
+    # begin a call of a stage
+    def start(self, name):
+        ''' Parameters
+            ----------
+            self: Profiler object
+            name: stage name as string
+
+            Returns
+            -------
+            depth of the stage as integer, passed to stop
+            to close stages left open by an error
+        '''
+        now = time.perf_counter()
+        local = self.__stack()
+        if local.stack:
+            # the enclosing stage pauses
+            local.stack[-1][1] += now - local.mark
+        local.stack.append([name, 0.0])
+        local.mark = now
+        return len(local.stack) - 1
+
+    # end the innermost call of a stage
+    def stop(self, bytes=0, rows=0, visits=0, depth=None):
+        ''' Parameters
+            ----------
+            self: Profiler object
+            bytes: characters or bytes processed by the call
+            rows: rules or data rows handled by the call
+            visits: tree nodes visited by the call
+            depth: depth returned by start, stages opened
+                   after it are closed first
+
+            Returns
+            -------
+            None
+        '''
+        now = time.perf_counter()
+        local = self.__stack()
+        if not local.stack:
+            return
+        if depth is None:
+            depth = len(local.stack) - 1
+        while len(local.stack) > depth:
+            name, seconds = local.stack.pop()
+            seconds = seconds + now - local.mark
+            local.mark = now
+            last = len(local.stack) == depth
+            self.__add(name, seconds, bytes if last else 0, rows if last else 0, visits if last else 0)
+
+    def __add(self, name, seconds, bytes, rows, visits):
+        with self.__lock:
+            stage = self.__stages.get(name)
+            if stage is None:
+                stage = self.__stages[name] = dict.fromkeys(FIELDS, 0)
+            stage["calls"] = stage["calls"] + 1
+            stage["seconds"] = stage["seconds"] + seconds
+            stage["bytes"] = stage["bytes"] + bytes
+            stage["rows"] = stage["rows"] + rows
+            stage["visits"] = stage["visits"] + visits
+
+    # time a block
+    def stage(self, name):
+        ''' Parameters
+            ----------
+            self: Profiler object
+            name: stage name as string
+
+            Returns
+            -------
+            stage object to use in a with statement, set
+            its bytes, rows and visits inside the block
+        '''
+        return Stage(self, name)
+
+    # time every call of a function
+    def wrap(self, name, func):
+        ''' Parameters
+            ----------
+            self: Profiler object
+            name: stage name as string
+            func: function to time
+
+            Returns
+            -------
+            function calling func as one call of the stage
+        '''
+        def timed(*args):
+            depth = self.start(name)
+            try:
+                return func(*args)
+            finally:
+                self.stop(depth=depth)
+        return timed
+
+    # time every item drawn from an iterable
+    def iterate(self, name, items, size=None, consumer=None):
+        ''' Parameters
+            ----------
+            self: Profiler object
+            name: stage name as string
+            items: iterable to draw from
+            size: function giving the bytes of an item,
+                  None to count none
+            consumer: stage name of the work done with each
+                      item between draws, None to time none
+
+            Returns
+            -------
+            generator of the same items, producing each
+            one is a call of the stage
+        '''
+        items = iter(items)
+        while True:
+            depth = self.start(name)
+            try:
+                item = next(items)
+            except StopIteration:
+                self.stop(depth=depth)
+                return
+            except BaseException:
+                self.stop(depth=depth)
+                raise
+            self.stop(size(item) if size else 0, depth=depth)
+            if consumer is None:
+                yield item
+                continue
+
+            # the caller's loop body runs while suspended
+            depth = self.start(consumer)
+            try:
+                yield item
+            finally:
+                self.stop(rows=1, depth=depth)
+
+    # drop everything recorded
+    def reset(self):
+        ''' Parameters
+            ----------
+            self: Profiler object
+
+            Returns
+            -------
+            None
+        '''
+        with self.__lock:
+            self.__stages = {}
+
+    # export as plain data
+    def as_dict(self):
+        ''' Parameters
+            ----------
+            self: Profiler object
+
+            Returns
+            -------
+            dict of stage name to calls, seconds, bytes,
+            rows and node visits, with rows_per_second
+            for stages that handled rows
+        '''
+        with self.__lock:
+            out = {name: dict(stage) for name, stage in self.__stages.items()}
+        for stage in out.values():
+            if stage["rows"] and stage["seconds"]:
+                stage["rows_per_second"] = stage["rows"] / stage["seconds"]
+        return out
+
+    # export in the prometheus text format
+    def to_prometheus(self, prefix="tana2tree", labels=None):
+        ''' Parameters
+            ----------
+            self: Profiler object
+            prefix: metric name prefix as string
+            labels: dict of extra labels put on every
+                    sample, e.g. {"model": "churn"}
+
+            Returns
+            -------
+            metrics as string, zero counters are left out
+        '''
+        stages = self.as_dict()
+        extra = "".join(',{0}="{1}"'.format(k, _escape(v)) for k, v in sorted((labels or {}).items()))
+        lines = []
+        for metric, help_text, kind, field in METRICS:
+            samples = [(name, stage[field]) for name, stage in sorted(stages.items()) if stage.get(field)]
+            if not samples:
+                continue
+            name = "{0}_{1}".format(prefix, metric)
+            lines.append("# HELP {0} {1}".format(name, help_text))
+            lines.append("# TYPE {0} {1}".format(name, kind))
+            for stage, value in samples:
+                lines.append('{0}{{stage="{1}"{2}}} {3!r}'.format(name, _escape(stage), extra, value))
+        return "\n".join(lines) + "\n" if lines else ""
+
+# escape a prometheus label value
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+# stage recording nothing, used when profiling is off
+NO_STAGE = Stage(None, None)
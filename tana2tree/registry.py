@@ -0,0 +1,337 @@
+# Author:   Bradley Reeves <bradleyaaronreeves@gmail.com>
+# Date:     October 18, 2020
+# About:    Converts a Tanagra tree description from HTML
+#           to a usable format.
+
+import hashlib
+import io
+import os
+import threading
+import time
+import tracemalloc
+import tana2tree.tana2tree as t2t
+
+# tracing is process wide, so registries
+# measuring memory take turns
+_TRACE_LOCK = threading.Lock()
+
+# model class
+# one loaded version of a watched report
+class Model:
+    def __init__(self, name, path, parser, compiled, digest, stamp, version, load_seconds, memory):
+        ''' Parameters
+            ----------
+            self: Model object
+            name: model name as string
+            path: path/name of report as string
+            parser: tanagra parser object holding the tree
+            compiled: compiled tree object, None when not compiled
+            digest: sha256 of the report as hex string
+            stamp: (mtime_ns, size) of the report when read
+            version: load count of this name as integer
+            load_seconds: time to parse and compile
+            memory: bytes allocated by the load, None
+                    when not tracked
+
+            Returns
+            -------
+            None
+        '''
+        self.name = name
+        self.path = path
+        self.parser = parser
+        self.compiled = compiled
+        self.digest = digest
+        self.stamp = stamp
+        self.version = version
+        self.loaded = time.time()
+        self.load_seconds = load_seconds
+        self.memory = memory
+
+    def __repr__(self):
+        return "Model({0!r}, version={1})".format(self.name, self.version)
+
+    # predict with the compiled tree
+    def predict(self, X):
+        ''' Parameters
+            ----------
+            self: Model object
+            X: rows as accepted by Compiled_Tree.predict
+
+            Returns
+            -------
+            predicted original class label of each row
+        '''
+        if self.compiled is None:
+            raise ValueError("model {0!r} is not compiled".format(self.name))
+        return self.compiled.predict(X)
+
+# model registry class
+# holds models by name and reloads changed reports
+class Model_Registry:
+    def __init__(self, compiled=False, features=None, layout="level", track_memory=False):
+        ''' Parameters
+            ----------
+            self: Model Registry object
+            compiled: also compile each tree, requires numpy
+            features: passed to Tanagra_Parser.compile
+            layout: passed to Tanagra_Parser.compile
+            track_memory: also measure bytes allocated by each
+                          load, with tracemalloc in a second
+                          parse so load times stay untraced
+
+            Returns
+            -------
+            None
+        '''
+        self.compiled = compiled
+        self.features = features
+        self.layout = layout
+        self.track_memory = track_memory
+
+        # name -> model, replaced whole so readers
+        # never see a half loaded model
+        self.__models = {}
+        self.__paths = {}
+        self.__status = {}
+        self.__failed = {}
+        self.__lock = threading.Lock()
+        self.__stop = None
+        self.__thread = None
+
+    def __len__(self):
+        return len(self.__models)
+
+    def __contains__(self, name):
+        return name in self.__models
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    # start watching a report
+    def watch(self, name, path):
+        ''' Parameters
+            ----------
+            self: Model Registry object
+            name: model name as string
+            path: path/name of report as string
+
+            Returns
+            -------
+            True when the report loaded, otherwise the error
+            is kept in stats() and the name has no model yet
+        '''
+        with self.__lock:
+            self.__paths[name] = path
+            self.__status[name] = {"reloads": 0, "failures": 0, "error": None}
+            self.__failed.pop(name, None)
+            self.__models.pop(name, None)
+            return self.__check(name)
+
+    # stop watching a report and drop its model
+    def unwatch(self, name):
+        ''' Parameters
+            ----------
+            self: Model Registry object
+            name: model name as string
+
+            Returns
+            -------
+            None
+        '''
+        with self.__lock:
+            self.__paths.pop(name, None)
+            self.__status.pop(name, None)
+            self.__failed.pop(name, None)
+            self.__models.pop(name, None)
+
+    # names being watched
+    def names(self):
+        ''' Parameters
+            ----------
+            self: Model Registry object
+
+            Returns
+            -------
+            watched model names as list, including
+            ones that have not loaded yet
+        '''
+        return list(self.__paths)
+
+    # current model of a name
+    def get(self, name):
+        ''' Parameters
+            ----------
+            self: Model Registry object
+            name: model name as string
+
+            Returns
+            -------
+            model object, keep it for the whole prediction
+            so a reload cannot change it midway
+        '''
+        try:
+            return self.__models[name]
+        except KeyError:
+            raise KeyError("no model loaded for {0!r}".format(name)) from None
+
+    # predict with the current model of a name
+    def predict(self, name, X):
+        ''' Parameters
+            ----------
+            self: Model Registry object
+            name: model name as string
+            X: rows as accepted by Compiled_Tree.predict
+
+            Returns
+            -------
+            predicted original class label of each row
+        '''
+        return self.get(name).predict(X)
+
+    # reload every report that changed
+    def check(self):
+        ''' Parameters
+            ----------
+            self: Model Registry object
+
+            Returns
+            -------
+            names reloaded as list
+        '''
+        with self.__lock:
+            return [name for name in list(self.__paths) if self.__check(name)]
+
+    # reload one report if it changed
+    def __check(self, name):
+        path = self.__paths[name]
+        old = self.__models.get(name)
+        try:
+            # size and mtime rule out most reports without
+            # reading them, the hash catches rewrites of the
+            # same content
+            stat = os.stat(path)
+        except OSError as e:
+            return self.__fail(name, None, e)
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        if (old is not None and old.stamp == stamp) or self.__failed.get(name) == stamp:
+            return False
+
+        try:
+            with open(path, "rb") as file_in:
+                data = file_in.read()
+            digest = hashlib.sha256(data).hexdigest()
+            if old is not None and old.digest == digest:
+                old.stamp = stamp
+                return False
+            model = self.__load(name, path, data, digest, stamp, 1 if old is None else old.version + 1)
+        except Exception as e:
+            return self.__fail(name, stamp, e)
+
+        self.__models[name] = model
+        self.__failed.pop(name, None)
+        status = self.__status[name]
+        status["reloads"] = status["reloads"] + 1
+        status["error"] = None
+        return True
+
+    # record a failed check
+    def __fail(self, name, stamp, e):
+        # the last good model stays in place and the broken
+        # report is not retried until it changes again
+        if stamp is not None:
+            self.__failed[name] = stamp
+        status = self.__status[name]
+        status["failures"] = status["failures"] + 1
+        status["error"] = "{0}: {1}".format(type(e).__name__, e)
+        return False
+
+    # parse and compile a report
+    def __load(self, name, path, data, digest, stamp, version):
+        start = time.perf_counter()
+        parser, compiled = self.__parse(data)
+        seconds = time.perf_counter() - start
+        memory = self.__measure(data) if self.track_memory else None
+        return Model(name, path, parser, compiled, digest, stamp, version, seconds, memory)
+
+    def __parse(self, data):
+        parser = t2t.Tanagra_Parser()
+
+        # decode the same way open() does
+        parser.parse_text(io.TextIOWrapper(io.BytesIO(data)).read())
+        compiled = parser.compile(self.features, self.layout) if self.compiled else None
+        return parser, compiled
+
+    # bytes a load keeps allocated, from a traced parse
+    def __measure(self, data):
+        with _TRACE_LOCK:
+            tracing = not tracemalloc.is_tracing()
+            if tracing:
+                tracemalloc.start()
+            try:
+                before = tracemalloc.get_traced_memory()[0]
+                # the parse is kept alive until it is measured
+                parsed = self.__parse(data)
+                return tracemalloc.get_traced_memory()[0] - before
+            finally:
+                if tracing:
+                    tracemalloc.stop()
+
+    # poll in a background thread
+    def start(self, interval=1.0):
+        ''' Parameters
+            ----------
+            self: Model Registry object
+            interval: seconds between checks
+
+            Returns
+            -------
+            None
+        '''
+        if self.__thread is not None:
+            return
+        self.__stop = threading.Event()
+
+        def poll(stop):
+            while not stop.wait(interval):
+                self.check()
+
+        self.__thread = threading.Thread(target=poll, args=(self.__stop,), name="tana2tree-registry", daemon=True)
+        self.__thread.start()
+
+    # stop the background thread
+    def stop(self):
+        ''' Parameters
+            ----------
+            self: Model Registry object
+
+            Returns
+            -------
+            None
+        '''
+        if self.__thread is not None:
+            self.__stop.set()
+            self.__thread.join()
+            self.__thread = None
+
+    # export load figures
+    def stats(self):
+        ''' Parameters
+            ----------
+            self: Model Registry object
+
+            Returns
+            -------
+            dict of name to version, load_seconds, memory,
+            reloads, failures and last error
+        '''
+        out = {}
+        for name, status in list(self.__status.items()):
+            model = self.__models.get(name)
+            out[name] = dict(status, version=model.version if model else None,
+                             load_seconds=model.load_seconds if model else None,
+                             memory=model.memory if model else None)
+        return out
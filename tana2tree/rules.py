@@ -0,0 +1,134 @@
+# Author:   Bradley Reeves <bradleyaaronreeves@gmail.com>
+# Date:     October 18, 2020
+# About:    Converts a Tanagra tree description from HTML
+#           to a usable format.
+
+import csv
+import numpy as np
+
+# rule table class
+# root to leaf conditions of every leaf
+class Rule_Table:
+    def __init__(self, tree):
+        ''' Parameters
+            ----------
+            self: Rule Table object
+            tree: compiled tree object, rules are indexed
+                  by its node ids as returned by apply
+
+            Returns
+            -------
+            None
+        '''
+        self.features = tree.features
+        self.classes = tree.classes
+
+        # tuples of (attribute, op, value) per node, built
+        # once by carrying each path down the tree, internal
+        # nodes keep None
+        n = len(tree)
+        self.conditions = np.empty(n, dtype=object)
+        self.text = np.full(n, "", dtype=object)
+        stack = [(0, (), "")]
+        while stack:
+            i, path, text = stack.pop()
+            j = tree.feature[i]
+            if j < 0:
+                self.conditions[i] = path
+                self.text[i] = text
+                continue
+            name, value = self.features[j], float(tree.threshold[i])
+            join = text + " and " if text else ""
+            stack.append((tree.right[i], path + ((name, ">=", value),), "{0}{1} >= {2!r}".format(join, name, value)))
+            stack.append((tree.left[i], path + ((name, "<", value),), "{0}{1} < {2!r}".format(join, name, value)))
+
+        # leaf ids in node order and their statistics
+        self.leaves = np.flatnonzero(tree.feature < 0)
+        self.label = np.full(n, None, dtype=object)
+        self.label[self.leaves] = tree.classes[tree.leaf_class[self.leaves]]
+        self.examples = tree.examples
+        self.purity = tree.leaf_proba[np.arange(n), np.maximum(tree.leaf_class, 0)]
+
+    def __len__(self):
+        ''' Parameters
+            ----------
+            self: Rule Table object
+
+            Returns
+            -------
+            number of rules as integer
+        '''
+        return len(self.leaves)
+
+    # rule of one leaf
+    def rule(self, leaf):
+        ''' Parameters
+            ----------
+            self: Rule Table object
+            leaf: leaf node id as integer
+
+            Returns
+            -------
+            conditions from the root as tuple of
+            (attribute, op, value) tuples
+        '''
+        if self.conditions[leaf] is None:
+            raise KeyError("node {0} is not a leaf".format(leaf))
+        return self.conditions[leaf]
+
+    # rules of many rows
+    def explain(self, leaves, as_text=True):
+        ''' Parameters
+            ----------
+            self: Rule Table object
+            leaves: leaf node ids as returned by apply
+            as_text: conditions joined with "and" when True,
+                     tuples of (attribute, op, value) otherwise
+
+            Returns
+            -------
+            rule of each row as numpy object array, gathered
+            from the table without walking the tree
+        '''
+        return (self.text if as_text else self.conditions)[np.asarray(leaves)]
+
+    # rule set as lines of text
+    def to_text(self):
+        ''' Parameters
+            ----------
+            self: Rule Table object
+
+            Returns
+            -------
+            one "if ... then class" line per leaf as string,
+            with leaf statistics when the report has them
+        '''
+        lines = []
+        for i in self.leaves:
+            line = "leaf {0}: if {1} then {2}".format(i, self.text[i] or "true", self.label[i])
+            if self.examples[i] >= 0:
+                line = line + " ({0:.2f} % of {1} examples)".format(self.purity[i] * 100, self.examples[i])
+            lines.append(line)
+        return "\n".join(lines) + "\n"
+
+    # write the rule set as csv
+    def write_csv(self, file_name):
+        ''' Parameters
+            ----------
+            self: Rule Table object
+            file_name: path/name of file to write as string
+
+            Returns
+            -------
+            None: writes one row per leaf with its id, class,
+            examples, purity, depth and conditions, statistics
+            are empty when the report has none
+        '''
+        with open(file_name, "w", newline="") as file_out:
+            writer = csv.writer(file_out)
+            writer.writerow(["leaf", "class", "examples", "purity", "depth", "conditions"])
+            for i in self.leaves:
+                known = self.examples[i] >= 0
+                writer.writerow([i, self.label[i], self.examples[i] if known else "",
+                                 round(float(self.purity[i]), 6) if known else "",
+                                 len(self.conditions[i]), self.text[i]])
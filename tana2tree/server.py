@@ -0,0 +1,559 @@
+# Author:   Bradley Reeves <bradleyaaronreeves@gmail.com>
+# Date:     October 18, 2020
+# About:    Converts a Tanagra tree description from HTML
+#           to a usable format.
+
+import argparse
+import asyncio
+import collections
+import json
+import os
+import sys
+import numpy as np
+import tana2tree.registry as rg
+
+# latencies kept for percentiles
+LATENCY_WINDOW = 10000
+
+# largest request body accepted
+MAX_BODY = 16 * 1024 * 1024
+
+# reason phrases of the status codes sent
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           413: "Payload Too Large", 500: "Internal Server Error"}
+
+# batch stats class
+# request latencies and batch sizes of one model
+class Batch_Stats:
+    def __init__(self, max_batch, window=LATENCY_WINDOW):
+        ''' Parameters
+            ----------
+            self: Batch Stats object
+            max_batch: most rows per batch, the largest
+                       histogram bucket
+            window: latencies kept for percentiles
+
+            Returns
+            -------
+            None
+        '''
+        self.requests = self.rows = self.batches = self.errors = 0
+        self.latencies = collections.deque(maxlen=window)
+
+        # batches per power of two bucket, larger
+        # requests are scored alone and go to "inf"
+        self.bounds = []
+        bound = 1
+        while bound < max_batch:
+            self.bounds.append(bound)
+            bound = bound * 2
+        self.bounds.append(max_batch)
+        self.sizes = collections.Counter()
+
+    # record one scored batch
+    def add_batch(self, rows):
+        ''' Parameters
+            ----------
+            self: Batch Stats object
+            rows: rows in the batch as integer
+
+            Returns
+            -------
+            None
+        '''
+        self.batches = self.batches + 1
+        self.rows = self.rows + rows
+        for bound in self.bounds:
+            if rows <= bound:
+                self.sizes[str(bound)] += 1
+                return
+        self.sizes["inf"] += 1
+
+    # record one answered request
+    def add_request(self, seconds, error=False):
+        ''' Parameters
+            ----------
+            self: Batch Stats object
+            seconds: time from arrival to answer
+            error: True when the request failed
+
+            Returns
+            -------
+            None
+        '''
+        self.requests = self.requests + 1
+        if error:
+            self.errors = self.errors + 1
+        self.latencies.append(seconds)
+
+    # export as plain data
+    def as_dict(self):
+        ''' Parameters
+            ----------
+            self: Batch Stats object
+
+            Returns
+            -------
+            dict of counts, latency percentiles in ms
+            over the window and the batch size histogram
+        '''
+        latencies = sorted(self.latencies)
+        percentiles = {}
+        for name, q in (("p50", 0.5), ("p90", 0.9), ("p99", 0.99), ("max", 1.0)):
+            if latencies:
+                percentiles[name] = latencies[min(int(len(latencies) * q), len(latencies) - 1)] * 1000
+        sizes = {str(bound): self.sizes[str(bound)] for bound in self.bounds}
+        sizes["inf"] = self.sizes["inf"]
+        return {"requests": self.requests, "errors": self.errors, "rows": self.rows, "batches": self.batches,
+                "mean_batch": self.rows / self.batches if self.batches else 0.0,
+                "latency_ms": percentiles, "batch_sizes": sizes}
+
+# micro batcher class
+# collects concurrent requests into one call
+class Micro_Batcher:
+    def __init__(self, score, max_batch=256, max_wait=0.002, stats=None):
+        ''' Parameters
+            ----------
+            self: Micro Batcher object
+            score: function taking a list of items and returning
+                   one result or exception per item
+            max_batch: rows that close a batch at once
+            max_wait: seconds a batch waits for more rows
+                      after its first item arrives
+            stats: batch stats object, None to keep none
+
+            Returns
+            -------
+            None
+        '''
+        self.score = score
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.stats = stats
+        self.__pending = collections.deque()
+        self.__rows = 0
+        self.__arrived = None
+        self.__full = None
+        self.__task = None
+
+    # score an item with whatever else arrives
+    async def submit(self, item, rows):
+        ''' Parameters
+            ----------
+            self: Micro Batcher object
+            item: item passed on to score
+            rows: rows the item holds as integer
+
+            Returns
+            -------
+            result of the item, its exception is raised
+        '''
+        loop = asyncio.get_event_loop()
+        if self.__task is None:
+            self.__arrived = asyncio.Event()
+            self.__full = asyncio.Event()
+            self.__task = loop.create_task(self.__run())
+        future = loop.create_future()
+        self.__pending.append((item, rows, future, loop.time()))
+        self.__rows = self.__rows + rows
+        self.__arrived.set()
+        if self.__rows >= self.max_batch:
+            self.__full.set()
+        return await future
+
+    # stop batching, waiting callers are cancelled
+    def close(self):
+        ''' Parameters
+            ----------
+            self: Micro Batcher object
+
+            Returns
+            -------
+            None
+        '''
+        if self.__task is not None:
+            self.__task.cancel()
+            self.__task = None
+        while self.__pending:
+            self.__pending.popleft()[2].cancel()
+        self.__rows = 0
+
+    async def __run(self):
+        loop = asyncio.get_event_loop()
+        while True:
+            await self.__arrived.wait()
+
+            # a batch closes once it is full or its first
+            # item waited max_wait since it arrived, items
+            # left over by the last batch wait only the rest
+            wait = self.max_wait - (loop.time() - self.__pending[0][3]) if self.__pending else 0
+            if self.__rows < self.max_batch and wait > 0:
+                try:
+                    await asyncio.wait_for(self.__full.wait(), wait)
+                except asyncio.TimeoutError:
+                    pass
+
+            batch, rows = [], 0
+            while self.__pending and (not batch or rows + self.__pending[0][1] <= self.max_batch):
+                batch.append(self.__pending.popleft())
+                rows = rows + batch[-1][1]
+            self.__rows = self.__rows - rows
+            if not self.__pending:
+                self.__arrived.clear()
+            if self.__rows < self.max_batch:
+                self.__full.clear()
+
+            try:
+                results = self.score([item for item, _, _, _ in batch])
+            except Exception as e:
+                results = [e] * len(batch)
+
+            # rejected items were not scored
+            scored = sum(n for (_, n, _, _), result in zip(batch, results) if not isinstance(result, Exception))
+            if self.stats is not None and scored:
+                self.stats.add_batch(scored)
+            for (_, _, future, _), result in zip(batch, results):
+                if future.done():
+                    continue
+                if isinstance(result, Exception):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+
+# scoring server class
+# serves registry models over http with micro batching
+class Scoring_Server:
+    def __init__(self, registry, max_batch=256, max_wait=0.002):
+        ''' Parameters
+            ----------
+            self: Scoring Server object
+            registry: model registry object with compiled=True,
+                      reloaded models are picked up per batch
+            max_batch: rows that close a batch at once
+            max_wait: seconds a request waits for others
+
+            Returns
+            -------
+            None
+        '''
+        if not registry.compiled:
+            raise ValueError("the registry must compile its models")
+        self.registry = registry
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.__batchers = {}
+        self.__stats = {}
+        self.__server = None
+        self.__connections = set()
+
+    # listen for connections
+    async def start(self, host="127.0.0.1", port=8080):
+        ''' Parameters
+            ----------
+            self: Scoring Server object
+            host: address to bind as string
+            port: port to bind, 0 picks a free one
+
+            Returns
+            -------
+            port bound as integer
+        '''
+        self.__server = await asyncio.start_server(self.__handle, host, port)
+        return self.__server.sockets[0].getsockname()[1]
+
+    # serve until cancelled
+    async def serve_forever(self):
+        # the server accepts on its own, this only
+        # waits for the cancellation and closes
+        try:
+            await asyncio.get_event_loop().create_future()
+        finally:
+            await self.close()
+
+    # stop listening and batching
+    async def close(self):
+        ''' Parameters
+            ----------
+            self: Scoring Server object
+
+            Returns
+            -------
+            None
+        '''
+        if self.__server is not None:
+            self.__server.close()
+
+            # idle keep-alive connections see the end of
+            # the stream and finish on their own, newer
+            # pythons wait for them before closing
+            connections = list(self.__connections)
+            for writer in connections:
+                writer.close()
+            for writer in connections:
+                try:
+                    # python 3.6 writers have no wait_closed
+                    if hasattr(writer, "wait_closed"):
+                        await writer.wait_closed()
+                except ConnectionError:
+                    pass
+            await self.__server.wait_closed()
+            self.__server = None
+        for batcher in self.__batchers.values():
+            batcher.close()
+        self.__batchers = {}
+
+    # export batching figures
+    def stats(self):
+        ''' Parameters
+            ----------
+            self: Scoring Server object
+
+            Returns
+            -------
+            dict of model name to Batch_Stats.as_dict
+        '''
+        return {name: stats.as_dict() for name, stats in self.__stats.items()}
+
+    # score the requests of one batch
+    def __score(self, name, requests):
+        ''' Parameters
+            ----------
+            self: Scoring Server object
+            name: model name as string
+            requests: list of (rows, proba) tuples
+
+            Returns
+            -------
+            response dict or exception per request
+        '''
+        # one model for the whole batch even
+        # if a reload lands meanwhile
+        model = self.registry.get(name)
+        tree = model.compiled
+        results = [None] * len(requests)
+        arrays = []
+        for i, (rows, proba) in enumerate(requests):
+            try:
+                arrays.append((i, _as_array(tree, rows)))
+            except (ValueError, TypeError, KeyError) as e:
+                results[i] = ValueError("bad rows: {0}".format(e))
+        if not arrays:
+            return results
+
+        leaves = tree.apply(np.concatenate([X for _, X in arrays]))
+        labels = tree.classes[tree.leaf_class[leaves]].tolist()
+        start = 0
+        for i, X in arrays:
+            end = start + len(X)
+            out = {"model": name, "version": model.version, "predictions": labels[start:end]}
+            if requests[i][1]:
+                out["classes"] = tree.classes.tolist()
+                out["probabilities"] = tree.leaf_proba[leaves[start:end]].tolist()
+            results[i] = out
+            start = end
+        return results
+
+    # route one request
+    async def __route(self, method, path, body):
+        ''' Parameters
+            ----------
+            self: Scoring Server object
+            method: http method as string
+            path: request path as string
+            body: request body as bytes
+
+            Returns
+            -------
+            (status, payload) tuple
+        '''
+        parts = [part for part in path.split("?")[0].split("/") if part]
+        if parts == ["health"]:
+            return 200, {"status": "ok", "models": len(self.registry)}
+        if parts == ["stats"]:
+            return 200, self.stats()
+        if parts == ["models"]:
+            models = {}
+            for name in self.registry.names():
+                if name in self.registry:
+                    model = self.registry.get(name)
+                    models[name] = {"version": model.version, "features": model.compiled.features,
+                                    "classes": model.compiled.classes.tolist()}
+            return 200, models
+        if not parts or parts[0] != "predict" or len(parts) > 2:
+            return 404, {"error": "unknown path {0}".format(path)}
+        if method != "POST":
+            return 405, {"error": "use POST to predict"}
+
+        # the model name may be left out when there is one
+        if len(parts) == 2:
+            name = parts[1]
+        elif len(self.registry.names()) == 1:
+            name = self.registry.names()[0]
+        else:
+            return 404, {"error": "name the model, e.g. /predict/<name>"}
+        if name not in self.registry:
+            return 404, {"error": "no model loaded for {0!r}".format(name)}
+
+        try:
+            request = json.loads(body)
+            rows = [request["row"]] if "row" in request else request["rows"]
+            proba = bool(request.get("proba", False))
+            if not isinstance(rows, list):
+                raise TypeError("rows must be a list")
+        except (ValueError, TypeError, KeyError, AttributeError) as e:
+            return 400, {"error": "expected {\"rows\": [...]} or {\"row\": ...}: " + str(e)}
+
+        stats = self.__stats.get(name)
+        if stats is None:
+            stats = self.__stats[name] = Batch_Stats(self.max_batch)
+        batcher = self.__batchers.get(name)
+        if batcher is None:
+            score = lambda requests: self.__score(name, requests)
+            batcher = self.__batchers[name] = Micro_Batcher(score, self.max_batch, self.max_wait, stats)
+
+        loop = asyncio.get_event_loop()
+        start = loop.time()
+        try:
+            result = await batcher.submit((rows, proba), len(rows))
+        except ValueError as e:
+            stats.add_request(loop.time() - start, error=True)
+            return 400, {"error": str(e)}
+        except Exception as e:
+            stats.add_request(loop.time() - start, error=True)
+            return 500, {"error": "{0}: {1}".format(type(e).__name__, e)}
+        stats.add_request(loop.time() - start)
+        return 200, result
+
+    # serve one connection, kept open between requests
+    async def __handle(self, reader, writer):
+        self.__connections.add(writer)
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                method, path, version = line.decode("latin-1").split()
+                headers = {}
+                while True:
+                    header = await reader.readline()
+                    if header in (b"\r\n", b"\n", b""):
+                        break
+                    key, _, value = header.decode("latin-1").partition(":")
+                    headers[key.strip().lower()] = value.strip().lower()
+
+                connection = headers.get("connection", "")
+                keep_alive = connection == "keep-alive" if version == "HTTP/1.0" else connection != "close"
+                length = int(headers.get("content-length", 0))
+                if length > MAX_BODY:
+                    status, payload = 413, {"error": "body larger than {0} bytes".format(MAX_BODY)}
+                    keep_alive = False
+                else:
+                    body = await reader.readexactly(length) if length else b""
+                    status, payload = await self.__route(method, path, body)
+
+                data = json.dumps(payload).encode("utf-8")
+                writer.write("HTTP/1.1 {0} {1}\r\nContent-Type: application/json\r\nContent-Length: {2}\r\n"
+                             "Connection: {3}\r\n\r\n".format(status, REASONS[status], len(data),
+                                                              "keep-alive" if keep_alive else "close")
+                             .encode("latin-1") + data)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            # malformed requests and dropped
+            # clients end the connection
+            pass
+        finally:
+            self.__connections.discard(writer)
+            writer.close()
+
+# rows of a request as a 2-D array
+def _as_array(tree, rows):
+    ''' Parameters
+        ----------
+        tree: compiled tree object
+        rows: list of lists in features order or of dicts
+              keyed by original attribute names
+
+        Returns
+        -------
+        2-D float numpy array in features order
+    '''
+    if not rows:
+        return np.zeros((0, len(tree.features)))
+    if isinstance(rows[0], dict):
+        missing = [name for name in tree.features if any(name not in row for row in rows)]
+        if missing:
+            raise KeyError("rows missing attributes {0}".format(missing))
+        return np.array([[row[name] for name in tree.features] for row in rows], dtype=np.float64)
+    return tree.as_array(rows)
+
+# load reports and serve them
+async def serve(registry, host="127.0.0.1", port=8080, max_batch=256, max_wait=0.002):
+    ''' Parameters
+        ----------
+        registry: model registry object with compiled=True
+        host: address to bind as string
+        port: port to bind as integer
+        max_batch: rows that close a batch at once
+        max_wait: seconds a request waits for others
+
+        Returns
+        -------
+        None, serves until cancelled
+    '''
+    server = Scoring_Server(registry, max_batch, max_wait)
+    port = await server.start(host, port)
+    print("serving {0} models on http://{1}:{2}".format(len(registry), host, port), flush=True)
+    await server.serve_forever()
+
+def main(argv=None):
+    ''' Parameters
+        ----------
+        argv: command line arguments as list, sys.argv when None
+
+        Returns
+        -------
+        exit status, 1 when any report failed to load
+    '''
+    args = argparse.ArgumentParser(description="Serve Tanagra trees over HTTP with micro-batching.")
+    args.add_argument("reports", nargs="+", help="report paths, as name=path to set the model name")
+    args.add_argument("--host", default="127.0.0.1", help="address to bind")
+    args.add_argument("--port", type=int, default=8080, help="port to bind")
+    args.add_argument("--max-batch", type=int, default=256, help="rows that close a batch at once")
+    args.add_argument("--max-wait-ms", type=float, default=2.0, help="ms a request waits for others")
+    args.add_argument("--reload", type=float, default=None, help="seconds between checks for changed reports")
+    args = args.parse_args(argv)
+
+    registry = rg.Model_Registry(compiled=True)
+    failed = 0
+    for report in args.reports:
+        name, _, path = report.rpartition("=")
+        name = name or os.path.splitext(os.path.basename(path))[0]
+        if not registry.watch(name, path):
+            failed = failed + 1
+            print("{0}: FAILED {1}".format(path, registry.stats()[name]["error"]))
+    if failed:
+        return 1
+
+    if args.reload:
+        registry.start(args.reload)
+    # run the loop by hand, asyncio.run needs python 3.7
+    loop = asyncio.new_event_loop()
+    task = loop.create_task(serve(registry, args.host, args.port, args.max_batch, args.max_wait_ms / 1000))
+    try:
+        loop.run_until_complete(task)
+    except KeyboardInterrupt:
+        # let serve close its connections
+        task.cancel()
+        try:
+            loop.run_until_complete(task)
+        except asyncio.CancelledError:
+            pass
+    finally:
+        registry.stop()
+        loop.close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,245 +1,671 @@
-# Author:   Bradley Reeves <bradleyaaronreeves@gmail.com>
-# Date:     October 18, 2020
-# About:    Converts a Tanagra tree description from HTML
-#           to a usable format.
-
-import tana2tree.tree as t
-import time
-import re
-
-class Tanagra_Parser:
-    def __init__(self):
-        ''' Parameters
-            ----------
-            self: tanagra parser object
-            Returns
-            -------
-            None
-        '''
-        self.root = None
-        self.orig_labels = {}
-
-    def __next_tag(self, s, i):
-        ''' Parameters
-            ----------
-            self: tanagra parser object
-            s: string to search
-            i: starting index as integer
-            Returns
-            -------
-            next html tag as string 
-        '''
-        return re.search("</*..>", s[i:])
-
-    def __get_file(self, file_name):
-        ''' Parameters
-            ----------
-            self: tanagra parser object
-            file_name: path/name of file as string
-            Returns
-            -------
-            file as string 
-        '''
-        with open(file_name) as file_in:
-            return file_in.read()
-
-    def print_tree(self):
-        ''' Parameters
-            ----------
-            self: tanagra parser object
-            Returns
-            -------
-            None: prints tree to terminal
-        '''
-        self.root.print_tree()
-    
-    def set_orig_labels(self, d, u):
-        ''' Parameters
-            ----------
-            self: tanagra parser object
-            d: tree as dict with unique labels
-            u: dict of labels to update
-
-            Returns
-            -------
-            tree as dict with original labels
-        '''
-        for k, v in d.items():
-            if type(v) is dict:
-                self.set_orig_labels(v, u)
-            elif k == "attr":
-                d[k] = u[v]
-        return d
-    
-    def make_dict(self, unique_values=False):
-        ''' Parameters
-            ----------
-            self: tanagra parser object
-
-            Returns
-            -------
-            tree as dict
-        '''
-        d = self.root.to_dict(self.root.traverse(self.root))
-        if unique_values is False:
-            d = self.set_orig_labels(d, self.orig_labels)
-        return d
-
-    def get_node(self, attr):
-        ''' Parameters
-            ----------
-            self: tanagra parser object
-            attr: node to retrieve as string
-            Returns
-            -------
-            node object as list
-        '''
-        return self.root.get_node(self.root, attr)
-
-    def traverse(self):
-        ''' Parameters
-            ----------
-            self: tanagra parser object
-            Returns
-            -------
-            tree nodes as list
-        '''
-        return self.root.traverse(self.root)
-
-    def parse(self, input_file):
-        ''' Parameters
-            ----------
-            self: tanagra parser object
-            input_file: tanagra description
-            Returns
-            -------
-            root node of tree
-        '''
-        # initialize variables to be used
-        depth, start_index = 0, 0
-        end = False
-
-        # dict that stores 
-        # parents and their operators
-        parents_ops = {}
-
-        # used to store unique keys
-        # parent can appear twice, targets
-        # can only appear once
-        labels = []
-
-        # get Tanagra output
-        descr = self.__get_file(input_file)
-
-        # remove noise
-        # \(.*?\) is everything between parenthesis
-        # <\/?[b]> is bold tags
-        descr = re.sub("\(.*?\)|<\/?[b]>", "", descr)
-
-        # extract target column name
-        target_header = re.search("<th>Target attribute</th>", descr).end(0)
-        target_start_i = target_header + self.__next_tag(descr, target_header).end()
-        target_col_name = descr[target_start_i:target_start_i + self.__next_tag(descr, target_start_i).start()][:-1]
-
-        # extract the unordered list
-        descr = re.search("<UL>(.*)</UL>", descr).group(0)
-
-        # loop through all tags in UL
-        while not end:
-            if self.__next_tag(descr, start_index):
-                # get the next tag and ending index
-                # ending index is used as start index of next search
-                tag = self.__next_tag(descr, start_index).group(0)
-                start_index = start_index + self.__next_tag(descr, start_index).end()
-
-                if tag == "<UL>":
-                    # we go down a tree level
-                    # for each <UL> tag
-                    depth = depth + 1
-
-                elif tag == "<LI>":
-                    # extract the list item string
-                    s = descr[start_index:start_index + self.__next_tag(descr, start_index).start()]
-
-                    # create attribute labels
-                    # by joining first letter of each word
-                    # also getting operator
-                    op = ""
-                    if s.find("<") != -1:
-                        ss = s[:s.find("<")]
-                        op = "<"
-                    else:
-                        ss = s[:s.find(">")]
-                        op = ">="
-
-                    if ss.find("_") != -1: attr = ss.split("_")
-                    elif ss.find("-") != -1: attr = ss.split("-")
-                    elif ss.find(".") != -1: attr = ss.split(".")
-                    else: attr = ss.split()
-
-                    # if multiple words, use first character of each word
-                    # otherwise, use the first two characters of word
-                    if len(attr) > 1: attr = "".join(c[0] for c in attr)
-                    else: attr = attr[0][:2]
-                    
-                    # get the values
-                    # [\d]+[.,\d]+ is values w/ commas
-                    # [\d]*[.][\d]+ is floating point values
-                    # [\d]+ is integers
-                    value = float(re.search('[\d]+[.,\d]+|[\d]*[.][\d]+|[\d]+', s).group(0))
-
-                    # insert the root node
-                    if depth == 1 and op == "<":
-                        self.root = t.Tree_Node(None, None, attr, op, value)
-
-                    # parent nodes can have at most
-                    # two labels
-                    post_fix = 0
-                    while labels.count(attr) > 1:
-                        post_fix = post_fix + 1
-                        if post_fix == 1: attr = attr + "_" + str(post_fix)
-                        else: attr = attr[:-1] + str(post_fix)
-                    labels.append(attr)
-                    post_fix = 0
-
-                    # insert parent nodes
-                    if "op" in parents_ops.keys():
-                        if parents_ops["op"] == "<":
-                            self.root.insert(parents_ops["parent"], parents_ops["op"],  attr, op, value)
-                        else:
-                            self.root.insert(parents_ops["parent"], parents_ops["op"], attr, op, value)
-                    parents_ops = {"parent": attr, "op": op}
-                    self.orig_labels[attr] = ss[:-1]
-
-                    # insert terminal nodes
-                    if "then" in s:
-                        # extract the target value
-                        target = s[s.find(target_col_name + " = ") + len(target_col_name + " = "):].replace(" ", "")
-
-                        # store original name
-                        orig_t = target
-                        
-                        # target values should be unique
-                        post_fix = 0
-                        while target in labels:
-                            post_fix = post_fix + 1
-                            if post_fix == 1: target = target + "_" + str(post_fix)
-                            else: target = target[:-1] + str(post_fix)
-                        labels.append(target)
-                        post_fix = 0
-                        
-                        if op == "<":
-                            self.root.insert(attr, op, target, None, None)
-                        else:
-                            self.root.insert(attr, op, target, None, None) 
-                        parents_ops = {}
-                        self.orig_labels[target] = orig_t         
-                else:
-                    # </UL> encountered, so
-                    # go up a tree level
-                    depth = depth - 1
-            else:
-                # no more tags found
-                end = True
-
-        return self.root
\ No newline at end of file
+# Author:   Bradley Reeves <bradleyaaronreeves@gmail.com>
+# Date:     October 18, 2020
+# About:    Converts a Tanagra tree description from HTML
+#           to a usable format.
+
+import tana2tree.tree as t
+import tana2tree.tokenizer as tk
+import tana2tree.codegen as cg
+import tana2tree.profiler as pf
+import codecs
+import functools
+import io
+import locale
+import time
+import re
+
+# unordered list holding the tree rules
+UL_PATTERN = re.compile("<UL>(.*)</UL>")
+
+# text length of a token
+def _token_size(token):
+    return len(token[1] or token[0])
+
+class Tanagra_Parser:
+    def __init__(self, cache=None, profiler=None):
+        ''' Parameters
+            ----------
+            self: tanagra parser object
+            cache: parse cache object consulted by parse,
+                   None to always parse
+            profiler: profiler object recording each parse
+                      stage and the scoring of compiled trees,
+                      None to record nothing
+            Returns
+            -------
+            None
+        '''
+        self.root = None
+        self.orig_labels = {}
+        self.cache = cache
+        self.profiler = profiler
+        self.__sources = {}
+
+    def __stage(self, name):
+        ''' Parameters
+            ----------
+            self: tanagra parser object
+            name: stage name as string
+            Returns
+            -------
+            stage object timing a with block
+        '''
+        if self.profiler is None:
+            return pf.NO_STAGE
+        return self.profiler.stage(name)
+
+    def __next_tag(self, s, i):
+        ''' Parameters
+            ----------
+            self: tanagra parser object
+            s: string to search
+            i: starting index as integer
+            Returns
+            -------
+            next html tag match at or after i
+        '''
+        return tk.TAG_PATTERN.search(s, i)
+
+    def __get_file(self, file_name):
+        ''' Parameters
+            ----------
+            self: tanagra parser object
+            file_name: path/name of file as string
+            Returns
+            -------
+            file as string 
+        '''
+        with open(file_name) as file_in:
+            return file_in.read()
+
+    def print_tree(self):
+        ''' Parameters
+            ----------
+            self: tanagra parser object
+            Returns
+            -------
+            None: prints tree to terminal
+        '''
+        self.root.print_tree()
+    
+    def set_orig_labels(self, d, u):
+        ''' Parameters
+            ----------
+            self: tanagra parser object
+            d: tree as dict with unique labels
+            u: dict of labels to update
+
+            Returns
+            -------
+            tree as dict with original labels
+        '''
+        stack = [d]
+        while stack:
+            nested = stack.pop()
+            for k, v in nested.items():
+                if type(v) is dict:
+                    stack.append(v)
+                elif k == "attr":
+                    nested[k] = u[v]
+        return d
+    
+    def make_dict(self, unique_values=False):
+        ''' Parameters
+            ----------
+            self: tanagra parser object
+
+            Returns
+            -------
+            tree as dict
+        '''
+        d = self.root.to_dict()
+        if unique_values is False:
+            d = self.set_orig_labels(d, self.orig_labels)
+        return d
+
+    def from_dict(self, d, orig_labels=None):
+        ''' Parameters
+            ----------
+            self: tanagra parser object
+            d: tree as returned by make_dict
+            orig_labels: dict of unique labels to original labels
+                         when d has unique values, labels are made
+                         the way parse() makes them when None
+            Returns
+            -------
+            root node of tree
+        '''
+        self.__sources = {}
+        self.orig_labels = {} if orig_labels is None else dict(orig_labels)
+        labels = t.Unique_Labels()
+
+        # nodes in report order
+        self.root = None
+        stack = [(d["tree_node"], None, None)]
+        while stack:
+            nd, parent, parent_op = stack.pop()
+            leaf = "l_child" not in nd and "r_child" not in nd
+            attr = nd["attr"]
+            if orig_labels is None:
+                attr = labels.add(attr if leaf else self.__abbreviate(attr))
+                self.orig_labels[attr] = nd["attr"]
+
+            op = None if leaf else "<"
+            if parent is None:
+                if leaf: raise ValueError("tree root must be a split")
+                node = self.root = t.Tree_Node(None, None, attr, op, nd["value"])
+            else:
+                node = parent.add_child(parent_op, attr, op, nd["value"])
+
+            if not leaf:
+                if "l_child" not in nd or "r_child" not in nd:
+                    raise ValueError("node {0} is missing a branch".format(nd["attr"]))
+                stack.append((nd["r_child"], node, ">="))
+                stack.append((nd["l_child"], node, "<"))
+        return self.root
+
+    def get_node(self, attr):
+        ''' Parameters
+            ----------
+            self: tanagra parser object
+            attr: node to retrieve as string
+            Returns
+            -------
+            node object as list
+        '''
+        return self.root.get_node(self.root, attr)
+
+    def traverse(self):
+        ''' Parameters
+            ----------
+            self: tanagra parser object
+            Returns
+            -------
+            tree nodes as list
+        '''
+        return self.root.traverse(self.root)
+
+    def iter_nodes(self, order="pre"):
+        ''' Parameters
+            ----------
+            self: tanagra parser object
+            order: "pre", "in" or "post" as string
+            Returns
+            -------
+            generator of tree nodes
+        '''
+        return self.root.iter_nodes(order)
+
+    def to_table(self):
+        ''' Parameters
+            ----------
+            self: tanagra parser object
+            Returns
+            -------
+            tree as a tuple of flat lists (attrs, ops, values,
+            l_children, r_children) in pre-order, orig_labels and
+            flat lists (examples, purity), children are list
+            indexes and -1 when missing
+        '''
+        attrs, ops, values, left, right, examples, purity = [], [], [], [], [], [], []
+        stack = [(self.root, left, -1)]
+        while stack:
+            node, children, parent = stack.pop()
+            i = len(attrs)
+            if parent >= 0: children[parent] = i
+            attrs.append(node.attr)
+            ops.append(node.op)
+            values.append(node.value)
+            left.append(-1)
+            right.append(-1)
+            examples.append(node.examples)
+            purity.append(node.purity)
+            if node.r_branch: stack.append((node.r_branch, right, i))
+            if node.l_branch: stack.append((node.l_branch, left, i))
+        return (attrs, ops, values, left, right, dict(self.orig_labels), examples, purity)
+
+    def from_table(self, table):
+        ''' Parameters
+            ----------
+            self: tanagra parser object
+            table: tree as returned by to_table
+            Returns
+            -------
+            root node of tree
+        '''
+        attrs, ops, values, left, right, orig_labels, examples, purity = table
+        nodes = [None] * len(attrs)
+        nodes[0] = t.Tree_Node(None, None, attrs[0], ops[0], values[0])
+
+        # children always come after
+        # their parent in pre-order
+        for i, node in enumerate(nodes):
+            node.examples = examples[i]
+            node.purity = purity[i]
+            for parent_op, c in (("<", left[i]), (">=", right[i])):
+                if c >= 0:
+                    nodes[c] = node.add_child(parent_op, attrs[c], ops[c], values[c])
+
+        self.root = nodes[0]
+        self.orig_labels = dict(orig_labels)
+        self.__sources = {}
+        return self.root
+
+    def compact(self):
+        ''' Parameters
+            ----------
+            self: tanagra parser object
+            Returns
+            -------
+            root node of tree, now a view over a compact
+            array-backed tree that is read only
+        '''
+        import tana2tree.compact as c
+        self.root = c.Compact_Tree(self.to_table()).root
+        self.__sources = {}
+        return self.root
+
+    def save(self, file_name):
+        ''' Parameters
+            ----------
+            self: tanagra parser object
+            file_name: path/name of file to write as string
+            Returns
+            -------
+            None: writes the tree in the binary format
+        '''
+        import tana2tree.binary as bn
+        bn.write(file_name, self.to_table())
+
+    def load(self, file_name, use_mmap=True):
+        ''' Parameters
+            ----------
+            self: tanagra parser object
+            file_name: path/name of file written by save
+            use_mmap: map the file instead of reading it
+            Returns
+            -------
+            root node of tree, a read only view over the
+            file like compact() gives
+        '''
+        import tana2tree.binary as bn
+        tree, self.orig_labels = bn.read(file_name, use_mmap)
+        self.root = tree.root
+        self.__sources = {}
+        return self.root
+
+    def close(self):
+        ''' Parameters
+            ----------
+            self: tanagra parser object
+            Returns
+            -------
+            None: drops the tree and unmaps a file
+            opened by load
+        '''
+        tree = getattr(self.root, "tree", None)
+        if tree is not None:
+            tree.close()
+        self.root = None
+        self.orig_labels = {}
+        self.__sources = {}
+
+    def compile(self, features=None, layout="level"):
+        ''' Parameters
+            ----------
+            self: tanagra parser object
+            features: column order of 2-D input as list of
+                      original attribute names, tree order when None
+            layout: "level", or "hot" to check the path most
+                    training examples took first
+            Returns
+            -------
+            compiled tree object, requires numpy
+        '''
+        import tana2tree.predict as p
+        return p.Compiled_Tree(self.root, self.orig_labels, features, layout, self.profiler)
+
+    def compile_binned(self, features=None, max_cells=1 << 20):
+        ''' Parameters
+            ----------
+            self: tanagra parser object
+            features: column order of 2-D input as list of
+                      original attribute names, tree order when None
+            max_cells: largest lookup table, trees cutting their
+                       columns into more bin combinations remember
+                       the ones seen or walk the tree
+            Returns
+            -------
+            binned tree object, requires numpy
+        '''
+        import tana2tree.predict as p
+        return p.Binned_Tree(self.root, self.orig_labels, features, max_cells, self.profiler)
+
+    def get_features(self):
+        ''' Parameters
+            ----------
+            self: tanagra parser object
+            Returns
+            -------
+            original attribute names used by the tree
+            in level order as list
+        '''
+        features, level = [], [self.root]
+        while level:
+            for node in level:
+                if node.op is not None and self.orig_labels[node.attr] not in features:
+                    features.append(self.orig_labels[node.attr])
+            level = [b for node in level for b in (node.l_branch, node.r_branch) if b]
+        return features
+
+    def to_source(self, features=None, func_name="predict", visits=False):
+        ''' Parameters
+            ----------
+            self: tanagra parser object
+            features: column order of x as list of original
+                      attribute names, get_features() when None
+            func_name: name of generated function as string
+            visits: function also returns the splits tested
+            Returns
+            -------
+            python source of nested ifs scoring one row as string
+        '''
+        if features is None:
+            features = self.get_features()
+        key = (tuple(features), func_name, visits)
+        if key not in self.__sources:
+            self.__sources[key] = cg.make_source(self.root, self.orig_labels, features, func_name, visits)
+        return self.__sources[key]
+
+    def to_function(self, features=None):
+        ''' Parameters
+            ----------
+            self: tanagra parser object
+            features: column order of x as list of original
+                      attribute names, get_features() when None
+            Returns
+            -------
+            function scoring one row x, a sequence of values in
+            features order, its features attribute holds the order,
+            with a profiler each row is recorded as stage "score"
+        '''
+        if self.profiler is None:
+            return cg.compile_source(self.to_source(features))
+        return cg.profiled(cg.compile_source(self.to_source(features, visits=True)), self.profiler)
+
+    def write_module(self, file_name, features=None, func_name="predict"):
+        ''' Parameters
+            ----------
+            self: tanagra parser object
+            file_name: path/name of module to write as string
+            features: column order of x as list of original
+                      attribute names, get_features() when None
+            func_name: name of generated function as string
+            Returns
+            -------
+            None: writes an importable module
+        '''
+        with open(file_name, "w") as file_out:
+            file_out.write(self.to_source(features, func_name))
+
+    def parse(self, input_file):
+        ''' Parameters
+            ----------
+            self: tanagra parser object
+            input_file: tanagra description
+            Returns
+            -------
+            root node of tree
+        '''
+        if self.cache is not None:
+            return self.cache.parse(self, input_file)
+
+        # get Tanagra output
+        with self.__stage("read") as stage:
+            descr = self.__get_file(input_file)
+            stage.bytes = len(descr)
+        return self.parse_text(descr)
+
+    def parse_text(self, descr):
+        ''' Parameters
+            ----------
+            self: tanagra parser object
+            descr: tanagra description as string
+            Returns
+            -------
+            root node of tree
+        '''
+        # remove noise
+        with self.__stage("remove_noise") as stage:
+            stage.bytes = len(descr)
+            descr = tk.remove_noise(descr)
+
+        # extract target column name
+        with self.__stage("target") as stage:
+            stage.bytes = len(descr)
+            target_header = tk.HEADER_PATTERN.search(descr)
+            if target_header is None:
+                raise ValueError("no target attribute found")
+            target_start_i = self.__next_tag(descr, target_header.end()).end()
+            target_col_name = descr[target_start_i:self.__next_tag(descr, target_start_i).start()][:-1]
+
+            # locate the unordered list, the
+            # tokenizer walks it in place
+            ul = UL_PATTERN.search(descr)
+            if ul is None:
+                raise ValueError("no tree rules found")
+        return self.__build(target_col_name, tk.Tanagra_Tokenizer(descr, ul.start(), ul.end()))
+
+    def parse_stream(self, source, chunk_size=64 * 1024):
+        ''' Parameters
+            ----------
+            self: tanagra parser object
+            source: path/name of file as string, file object opened
+                    in text or binary mode, or iterable of str or
+                    bytes chunks, e.g. as a report is written
+            chunk_size: characters or bytes read at once
+            Returns
+            -------
+            root node of tree, built as rules arrive
+        '''
+        chunks = self.__read_chunks(source, chunk_size)
+        if self.profiler is not None:
+            # stages nest as the tokenizer pulls text,
+            # each is timed without the ones it pulls from
+            chunks = self.profiler.iterate("read", chunks, len)
+            chunks = self.profiler.iterate("remove_noise", tk.strip_noise(chunks), len)
+        else:
+            chunks = tk.strip_noise(chunks)
+        tokens = tk.Stream_Tokenizer(chunks)
+        with self.__stage("target"):
+            target_col_name = tokens.read_target()
+        return self.__build(target_col_name, tokens)
+
+    def __read_chunks(self, source, chunk_size):
+        ''' Parameters
+            ----------
+            self: tanagra parser object
+            source: see parse_stream
+            chunk_size: characters or bytes read at once
+            Returns
+            -------
+            generator of text chunks, bytes are decoded
+            the same way open() decodes a file
+        '''
+        if isinstance(source, str):
+            with open(source, "rb") as file_in:
+                yield from self.__read_chunks(file_in, chunk_size)
+            return
+
+        if hasattr(source, "read"):
+            source = iter(functools.partial(source.read, chunk_size), source.read(0))
+
+        decoder = None
+        for chunk in source:
+            if isinstance(chunk, bytes):
+                if decoder is None:
+                    decoder = io.IncrementalNewlineDecoder(
+                        codecs.getincrementaldecoder(locale.getpreferredencoding(False))(), True)
+                chunk = decoder.decode(chunk)
+            yield chunk
+        if decoder is not None:
+            yield decoder.decode(b"", final=True)
+
+    def __build(self, target_col_name, tokens):
+        ''' Parameters
+            ----------
+            self: tanagra parser object
+            target_col_name: target column name as string
+            tokens: iterable of (tag, text) tuples
+            Returns
+            -------
+            root node of tree
+        '''
+        # initialize variables to be used
+        depth = 0
+        self.__sources = {}
+        self.orig_labels = dict(self.orig_labels)
+
+        # dict that stores 
+        # parents and their operators
+        parents_ops = {}
+
+        # open parent node at each depth,
+        # the >= rule continues the < rule
+        open_nodes = {}
+
+        # used to store unique keys
+        # splits and targets each get one
+        labels = t.Unique_Labels()
+        add_label = labels.add
+
+        # time the tokenizer, the loop body and labels
+        # only when profiling, the loop never checks
+        if self.profiler is not None:
+            tokens = self.profiler.iterate("tokenize", tokens, _token_size, "insert")
+            add_label = self.profiler.wrap("labels", add_label)
+
+        # loop through all tags in UL
+        for tag, s in tokens:
+            if tag == tk.UL:
+                # we go down a tree level
+                # for each <UL> tag
+                depth = depth + 1
+
+            elif tag == tk.LI:
+                # leaf statistics come last
+                s, examples, purity = tk.split_stats(s)
+
+                # create attribute labels
+                # by joining first letter of each word
+                # also getting operator
+                op = ""
+                if s.find("<") != -1:
+                    ss = s[:s.find("<")]
+                    op = "<"
+                else:
+                    ss = s[:s.find(">")]
+                    op = ">="
+
+                attr = self.__abbreviate(ss)
+
+                # get the values
+                # [\d]+[.,\d]+ is values w/ commas
+                # [\d]*[.][\d]+ is floating point values
+                # [\d]+ is integers
+                value = float(re.search('[\d]+[.,\d]+|[\d]*[.][\d]+|[\d]+', s).group(0))
+
+                # insert the root node
+                if depth == 1 and op == "<":
+                    self.root = t.Tree_Node(None, None, attr, op, value)
+                    open_nodes[depth] = self.root
+
+                # a split takes one label on its < rule,
+                # the >= rule reuses it so nested splits
+                # with the same abbreviation never share one
+                if op == "<":
+                    attr = add_label(attr)
+                else:
+                    attr = open_nodes[depth].attr
+
+                # insert parent nodes
+                if "op" in parents_ops.keys():
+                    open_nodes[depth] = parents_ops["parent"].add_child(parents_ops["op"], attr, op, value)
+                parents_ops = {"parent": open_nodes[depth], "op": op}
+                self.orig_labels[attr] = ss[:-1]
+
+                # insert terminal nodes
+                if "then" in s:
+                    # extract the target value
+                    target = s[s.find(target_col_name + " = ") + len(target_col_name + " = "):].replace(" ", "")
+
+                    # store original name
+                    orig_t = target
+                    
+                    # target values should be unique
+                    target = add_label(target)
+
+                    leaf = open_nodes[depth].add_child(op, target, None, None)
+                    leaf.examples = examples
+                    leaf.purity = purity
+                    parents_ops = {}
+                    self.orig_labels[target] = orig_t         
+            else:
+                # </UL> encountered, so
+                # go up a tree level
+                depth = depth - 1
+
+        with self.__stage("roll_up"):
+            self.__roll_up()
+        return self.root
+
+    def __abbreviate(self, ss):
+        ''' Parameters
+            ----------
+            self: tanagra parser object
+            ss: attribute name as string
+            Returns
+            -------
+            label before postfixes as string
+        '''
+        if ss.find("_") != -1: attr = ss.split("_")
+        elif ss.find("-") != -1: attr = ss.split("-")
+        elif ss.find(".") != -1: attr = ss.split(".")
+        else: attr = ss.split()
+
+        # if multiple words, use first character of each word
+        # otherwise, use the first two characters of word
+        if len(attr) > 1: return "".join(c[0] for c in attr)
+        return attr[0][:2]
+
+    def __roll_up(self):
+        ''' Parameters
+            ----------
+            self: tanagra parser object
+            Returns
+            -------
+            None: internal nodes get the examples and
+            majority class share of their leaves
+        '''
+        # examples per class below each node, the minority of
+        # a leaf is spread evenly over the other classes
+        classes = set(self.orig_labels[n.attr] for n in self.root.iter_nodes() if n.op is None)
+        counts = {}
+        for node in self.root.iter_nodes("post"):
+            if node.op is None:
+                if node.examples is None:
+                    counts[node] = None
+                    continue
+                label = self.orig_labels[node.attr]
+                rest = node.examples * (1 - node.purity) / max(len(classes) - 1, 1)
+                counts[node] = {c: node.examples * node.purity if c == label else rest for c in classes}
+                continue
+
+            children = [counts.pop(b) for b in (node.l_branch, node.r_branch) if b]
+            if not children or None in children:
+                counts[node] = None
+                node.examples = node.purity = None
+                continue
+            counts[node] = {c: sum(child[c] for child in children) for c in classes}
+            node.examples = sum(b.examples for b in (node.l_branch, node.r_branch) if b)
+            node.purity = max(counts[node].values()) / node.examples if node.examples else None
\ No newline at end of file
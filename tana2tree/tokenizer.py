@@ -0,0 +1,266 @@
+# Author:   Bradley Reeves <bradleyaaronreeves@gmail.com>
+# Date:     October 18, 2020
+# About:    Converts a Tanagra tree description from HTML
+#           to a usable format.
+
+import re
+
+# html tags found in the unordered list
+# <UL>, <LI> and </UL> are all matched
+TAG_PATTERN = re.compile("</*..>")
+
+# event names emitted by the tokenizer
+UL, LI, END_UL = "<UL>", "<LI>", "</UL>"
+
+# tanagra tokenizer class
+# walks the unordered list once
+class Tanagra_Tokenizer:
+    def __init__(self, descr, pos=0, endpos=None):
+        ''' Parameters
+            ----------
+            self: Tanagra Tokenizer object
+            descr: tanagra description as string
+            pos: index to start tokenizing at as integer
+            endpos: index to stop tokenizing at as integer
+
+            Returns
+            -------
+            None
+        '''
+        self.descr = descr
+        self.pos = pos
+        self.endpos = len(descr) if endpos is None else endpos
+
+    # yield tag events in document order
+    def __iter__(self):
+        ''' Parameters
+            ----------
+            self: Tanagra Tokenizer object
+
+            Returns
+            -------
+            generator of (tag, text) tuples, text is the
+            list item string for <LI> and None otherwise
+        '''
+        descr, endpos = self.descr, self.endpos
+        pending = None
+
+        for match in TAG_PATTERN.finditer(descr, self.pos, endpos):
+            # the list item string runs up to the next tag
+            if pending is not None:
+                yield LI, descr[pending:match.start()]
+                pending = None
+
+            tag = match.group(0)
+            if tag == LI:
+                pending = match.end()
+            else:
+                yield tag, None
+
+        # last list item runs to the end of the block
+        if pending is not None:
+            yield LI, descr[pending:endpos]
+
+# noise removed before tokenizing
+# \((...) % of (...) examples\) is leaf statistics, kept
+# \(.*?\) is everything between parenthesis
+# <\/?[b]> is bold tags
+NOISE_PATTERN = re.compile(r"\((\d+(?:[.,]\d+)?) % of (\d+) examples\)|\(.*?\)|<\/?[b]>")
+
+# separates leaf statistics from the rule, never
+# appears in a report
+STATS_MARK = "\x1f"
+
+# replace one noise match
+def _replace_noise(match):
+    if match.group(1) is None:
+        return ""
+    return STATS_MARK + match.group(1) + STATS_MARK + match.group(2)
+
+# remove noise from text
+def remove_noise(text):
+    ''' Parameters
+        ----------
+        text: tanagra description as string
+
+        Returns
+        -------
+        text without noise, leaf statistics become
+        STATS_MARK purity STATS_MARK examples
+    '''
+    return NOISE_PATTERN.sub(_replace_noise, text)
+
+# split leaf statistics off a list item
+def split_stats(s):
+    ''' Parameters
+        ----------
+        s: list item text as string
+
+        Returns
+        -------
+        (text, examples, purity) tuple, examples as integer and
+        purity as a fraction, both None without statistics
+    '''
+    if STATS_MARK not in s:
+        return s, None, None
+    s, purity, examples = s.split(STATS_MARK)
+    return s, int(examples), float(purity.replace(",", ".")) / 100
+
+# header cell preceding the target column name
+HEADER_PATTERN = re.compile("<th>Target attribute</th>")
+
+# first tag of the unordered list
+UL_START_PATTERN = re.compile(UL)
+
+# tails that may still grow into a bold tag
+PARTIAL_TAGS = ("</b", "<b", "</", "<")
+
+# remove noise from a stream of text
+def strip_noise(chunks):
+    ''' Parameters
+        ----------
+        chunks: iterable of text chunks
+
+        Returns
+        -------
+        generator of text chunks with the same noise
+        removed as remove_noise on the whole text
+    '''
+    carry = ""
+    for chunk in chunks:
+        buf = carry + chunk
+
+        # a "(" after the last ")" and newline may
+        # still close in a later chunk, so hold it back
+        cut = buf.find("(", max(buf.rfind(")"), buf.rfind("\n")) + 1)
+        if cut < 0: cut = len(buf)
+        for tail in PARTIAL_TAGS:
+            if buf.endswith(tail):
+                cut = min(cut, len(buf) - len(tail))
+                break
+
+        if cut:
+            yield remove_noise(buf[:cut])
+        carry = buf[cut:]
+
+    if carry:
+        yield remove_noise(carry)
+
+# stream tokenizer class
+# tokenizes text as it arrives
+class Stream_Tokenizer:
+    def __init__(self, chunks):
+        ''' Parameters
+            ----------
+            self: Stream Tokenizer object
+            chunks: iterable of text chunks, noise already removed
+
+            Returns
+            -------
+            None
+        '''
+        self.chunks = iter(chunks)
+        self.buf = ""
+        self.pos = 0
+        self.target = None
+
+    # append the next chunk, dropping consumed text
+    def __more(self):
+        ''' Parameters
+            ----------
+            self: Stream Tokenizer object
+
+            Returns
+            -------
+            False once the stream is exhausted
+        '''
+        for chunk in self.chunks:
+            self.buf = self.buf[self.pos:] + chunk
+            self.pos = 0
+            return True
+        return False
+
+    # find the next match, reading as needed
+    def __search(self, pattern):
+        ''' Parameters
+            ----------
+            self: Stream Tokenizer object
+            pattern: compiled pattern to find
+
+            Returns
+            -------
+            match object, None at end of stream
+        '''
+        while True:
+            match = pattern.search(self.buf, self.pos)
+            if match or not self.__more():
+                return match
+
+    # read up to the unordered list
+    def read_target(self):
+        ''' Parameters
+            ----------
+            self: Stream Tokenizer object
+
+            Returns
+            -------
+            target column name as string
+        '''
+        match = self.__search(HEADER_PATTERN)
+        if match is None:
+            raise ValueError("no target attribute found")
+        self.pos = match.end()
+
+        # target name is the next cell's text
+        match = self.__search(TAG_PATTERN)
+        if match is None:
+            raise ValueError("no target attribute found")
+        self.pos = match.end()
+        match = self.__search(TAG_PATTERN)
+        if match is None:
+            raise ValueError("no target attribute found")
+        self.target = self.buf[self.pos:match.start()][:-1]
+        self.pos = match.start()
+        return self.target
+
+    # yield tag events up to the closing </UL>
+    def __iter__(self):
+        ''' Parameters
+            ----------
+            self: Stream Tokenizer object
+
+            Returns
+            -------
+            generator of (tag, text) tuples as Tanagra_Tokenizer
+        '''
+        if self.target is None:
+            self.read_target()
+        match = self.__search(UL_START_PATTERN)
+        if match is None:
+            raise ValueError("no tree rules found")
+        self.pos = match.start()
+
+        depth = 0
+        while True:
+            match = self.__search(TAG_PATTERN)
+            if match is None:
+                break
+            tag = match.group(0)
+
+            if tag == LI:
+                # the list item string runs
+                # up to the next tag
+                self.pos = match.end()
+                end = self.__search(TAG_PATTERN)
+                if end is None:
+                    yield LI, self.buf[self.pos:]
+                    break
+                yield LI, self.buf[self.pos:end.start()]
+                self.pos = end.start()
+                continue
+
+            self.pos = match.end()
+            yield tag, None
+            depth = depth + 1 if tag == UL else depth - 1
+            if depth == 0:
+                break
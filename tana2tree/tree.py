@@ -1,216 +1,291 @@
-# Author:   Bradley Reeves <bradleyaaronreeves@gmail.com>
-# Date:     October 18, 2020
-# About:    Converts a Tanagra tree description from HTML
-#           to a usable format.
-
-# chained dictionary class
-# set a dict value given a key list
-class Chain_Dict(dict):
-    def set_value(self, key_list, value):
-        ''' Parameters
-            ----------
-            self: Chain Dict object
-            key_list: list of dict indexes
-            value: string to insert at key_list
-
-            Returns
-            -------
-            None 
-        '''
-        t = self
-        for key in key_list[:-1]:
-            t = t.setdefault(key, {})
-        t.setdefault(key_list[-1], value)
-
-# tree node class
-# parses Tanagra tree
-class Tree_Node:
-    def __init__(self, parent, parent_op, attr, op, value):
-        ''' Parameters
-            ----------
-            self: Tree Node object
-            parent: parent attr as string
-            parent_op: parent operator as string
-            attr: current attr as string
-            op: current operator as string
-            value: current value as float
-
-            Returns
-            -------
-            None 
-        '''
-        self.l_branch = None
-        self.r_branch = None
-        self.parent = parent
-        self.parent_op = parent_op
-        self.attr = attr
-        self.op = op
-        self.value = value
-
-    # insert a node into the DT
-    def insert(self, parent, parent_op, attr, op, value):
-        ''' Parameters
-            ----------
-            self: Tree Node object
-            parent: parent attr as string
-            parent_op: parent operator as string
-            attr: current attr as string
-            op: current operator as string
-            value: current value as float
-
-            Returns
-            -------
-            None 
-        '''
-        if self.attr == parent:
-            if parent_op == "<":
-                self.l_branch = Tree_Node(parent, parent_op, attr, op, value)
-            else:
-                self.r_branch = Tree_Node(parent, parent_op, attr, op, value)
-        else:
-            if self.l_branch:
-                self.l_branch.insert(parent, parent_op, attr, op, value)
-            if self.r_branch:
-                self.r_branch.insert(parent, parent_op, attr, op, value)
-
-    # print the parsed DT
-    def print_tree(self, spacing=""):
-        ''' Parameters
-            ----------
-            self: Tree Node object
-            spacing: amount of space at beginning of line
-
-            Returns
-            -------
-            None 
-        '''
-        if self.value:
-            print(spacing + "Is {0} {1} {2}?".format(self.attr, self.op, self.value))
-        else:
-            print(spacing + "predict {0}".format(self.attr))
-
-        if self.l_branch: 
-            print(spacing + "--> True:")
-            self.l_branch.print_tree(spacing + "   ")
-
-        if self.r_branch: 
-            print(spacing + "--> False:")
-            self.r_branch.print_tree(spacing + "   ")
-
-        # returns all nodes in DT
-    def traverse(self, root):
-        ''' Parameters
-            ----------
-            self: Tree Node object
-            root: root node of tree
-
-            Returns
-            -------
-            node_list: all nodes in tree as list 
-        '''
-        node_list = []
-        if root:
-            node_list.append(root)
-            node_list = node_list + self.traverse(root.l_branch)
-            node_list = node_list + self.traverse(root.r_branch)
-        return node_list
-
-    # return node object from DT
-    def get_node(self, root, attr):
-        ''' Parameters
-            ----------
-            self: Tree Node object
-            root: root node of tree
-            x: target node attr as string
-
-            Returns
-            -------
-            node: target node object as list
-        '''
-        node = []
-        if root:
-            node = self.get_node(root.l_branch, attr)
-            if root.attr == attr: node.append(root)
-            node = node + self.get_node(root.r_branch, attr)
-        return node
-
-     # return the nested dict item
-    def __insert_dict(self, node):
-        ''' Parameters
-            ----------
-            self: Tree Node object
-            node: node to insert as node
-
-            Returns
-            -------
-            dict conaining node attr and value
-        '''
-        return {'attr': node.attr, 'value': node.value}
-
-    # convert DT to dict
-    def to_dict(self, node_list):
-        ''' Parameters
-            ----------
-            self: Tree Node object
-            node_list: a list of nodes in tree
-
-            Returns
-            -------
-            cd: tree as dict
-        '''
-        cd = Chain_Dict()
-
-        for node in node_list:
-            key_list = self.__get_path(self, node.attr)
-            cd.set_value(key_list, self.__insert_dict(node))
-
-        return cd
-
-    # check if a path exists
-    # to given DT node
-    def __has_path(self, node, path, x, move): 
-        ''' Parameters
-            ----------
-            self: Tree Node object
-            node: current node object
-            path: current path as list of strings
-            x: attr to search for as string
-            move: direction of travel as list of strings
-
-            Returns
-            -------
-            True: node exists and has path
-            False: node does not exist 
-        '''
-        if not node: return False
-        
-        if move == "right": path.append("r_child")  
-        if move == "left": path.append("l_child")  
-        
-        if node.attr == x: return True
-        
-        if self.__has_path(node.l_branch, path, x, 'left') or\
-           self.__has_path(node.r_branch, path, x, 'right'):
-            return True
-     
-        path.pop(-1)
-        return False
-  
-    # return path list to DT node
-    def __get_path(self, node, x): 
-        ''' Parameters
-            ----------
-            self: Tree Node object
-            node: current node object
-            x: attr to search for as string
-
-            Returns
-            -------
-            path: current path as list of strings 
-        '''
-        path = ['tree_node']
-         
-        if not self.__has_path(node, path, x, ''): 
-            print("No Path") 
-
-        return path
\ No newline at end of file
+# Author:   Bradley Reeves <bradleyaaronreeves@gmail.com>
+# Date:     October 18, 2020
+# About:    Converts a Tanagra tree description from HTML
+#           to a usable format.
+
+# chained dictionary class
+# set a dict value given a key list
+class Chain_Dict(dict):
+    def set_value(self, key_list, value):
+        ''' Parameters
+            ----------
+            self: Chain Dict object
+            key_list: list of dict indexes
+            value: string to insert at key_list
+
+            Returns
+            -------
+            None 
+        '''
+        t = self
+        for key in key_list[:-1]:
+            t = t.setdefault(key, {})
+        t.setdefault(key_list[-1], value)
+
+# unique label class
+# hands out label, label_1, label_2, ...
+class Unique_Labels:
+    def __init__(self):
+        ''' Parameters
+            ----------
+            self: Unique Labels object
+
+            Returns
+            -------
+            None
+        '''
+        # times each label was handed out
+        self.counts = {}
+
+        # first postfix not yet full, by (label, limit),
+        # counts only grow so it never moves back
+        self.next_postfix = {}
+
+    # label with the first postfix used fewer than limit times
+    def add(self, label, limit=1):
+        ''' Parameters
+            ----------
+            self: Unique Labels object
+            label: label as string
+            limit: times one unique label may be handed out
+
+            Returns
+            -------
+            unique label as string
+        '''
+        post_fix = self.next_postfix.get((label, limit), 0)
+        while True:
+            unique = label + "_" + str(post_fix) if post_fix else label
+            if self.counts.get(unique, 0) < limit:
+                break
+            post_fix = post_fix + 1
+        self.next_postfix[(label, limit)] = post_fix
+        self.counts[unique] = self.counts.get(unique, 0) + 1
+        return unique
+
+# tree node class
+# parses Tanagra tree
+class Tree_Node:
+    __slots__ = ("l_branch", "r_branch", "parent", "parent_op",
+                 "attr", "op", "value", "index", "examples", "purity")
+
+    def __init__(self, parent, parent_op, attr, op, value, index=None):
+        ''' Parameters
+            ----------
+            self: Tree Node object
+            parent: parent attr as string
+            parent_op: parent operator as string
+            attr: current attr as string
+            op: current operator as string
+            value: current value as float
+            index: attr to node dict shared by the tree,
+                   a new one is started when None
+
+            Returns
+            -------
+            None 
+        '''
+        self.l_branch = None
+        self.r_branch = None
+        self.parent = parent
+        self.parent_op = parent_op
+        self.attr = attr
+        self.op = op
+        self.value = value
+
+        # training examples reaching the node and the
+        # share of its majority class, None when unknown
+        self.examples = None
+        self.purity = None
+
+        # every node in the tree is
+        # registered under its attr
+        self.index = {} if index is None else index
+        self.index[attr] = self
+
+    # insert a node into the DT
+    def insert(self, parent, parent_op, attr, op, value):
+        ''' Parameters
+            ----------
+            self: Tree Node object
+            parent: parent attr as string
+            parent_op: parent operator as string
+            attr: current attr as string
+            op: current operator as string
+            value: current value as float
+
+            Returns
+            -------
+            None 
+        '''
+        # look the parent up instead
+        # of searching the tree for it
+        node = self.index.get(parent)
+        if node is not None:
+            node.add_child(parent_op, attr, op, value)
+
+    # attach a child to this node
+    def add_child(self, parent_op, attr, op, value):
+        ''' Parameters
+            ----------
+            self: Tree Node object
+            parent_op: this node's operator as string
+            attr: child attr as string
+            op: child operator as string
+            value: child value as float
+
+            Returns
+            -------
+            child: new child node object
+        '''
+        child = Tree_Node(self.attr, parent_op, attr, op, value, self.index)
+        if parent_op == "<":
+            self.l_branch = child
+        else:
+            self.r_branch = child
+        return child
+
+    # print the parsed DT
+    def print_tree(self, spacing=""):
+        ''' Parameters
+            ----------
+            self: Tree Node object
+            spacing: amount of space at beginning of line
+
+            Returns
+            -------
+            None 
+        '''
+        # strings on the stack are
+        # lines printed between subtrees
+        stack = [(self, spacing)]
+        while stack:
+            node, spacing = stack.pop()
+            if isinstance(node, str):
+                print(spacing + node)
+                continue
+
+            if node.value:
+                print(spacing + "Is {0} {1} {2}?".format(node.attr, node.op, node.value))
+            else:
+                print(spacing + "predict {0}".format(node.attr))
+
+            if node.r_branch:
+                stack.append((node.r_branch, spacing + "   "))
+                stack.append(("--> False:", spacing))
+            if node.l_branch:
+                stack.append((node.l_branch, spacing + "   "))
+                stack.append(("--> True:", spacing))
+
+    # yield the nodes of the DT
+    def iter_nodes(self, order="pre"):
+        ''' Parameters
+            ----------
+            self: Tree Node object
+            order: "pre", "in" or "post" as string
+
+            Returns
+            -------
+            generator of nodes below and including self
+        '''
+        if order == "pre":
+            stack = [self]
+            while stack:
+                node = stack.pop()
+                yield node
+                if node.r_branch: stack.append(node.r_branch)
+                if node.l_branch: stack.append(node.l_branch)
+
+        elif order == "in":
+            stack, node = [], self
+            while stack or node:
+                while node:
+                    stack.append(node)
+                    node = node.l_branch
+                node = stack.pop()
+                yield node
+                node = node.r_branch
+
+        elif order == "post":
+            # flag marks nodes whose
+            # children were already pushed
+            stack = [(self, False)]
+            while stack:
+                node, expanded = stack.pop()
+                if expanded:
+                    yield node
+                    continue
+                stack.append((node, True))
+                if node.r_branch: stack.append((node.r_branch, False))
+                if node.l_branch: stack.append((node.l_branch, False))
+
+        else:
+            raise ValueError("order must be pre, in or post, not {0!r}".format(order))
+
+    # returns all nodes in DT
+    def traverse(self, root):
+        ''' Parameters
+            ----------
+            self: Tree Node object
+            root: root node of tree
+
+            Returns
+            -------
+            node_list: all nodes in tree as list 
+        '''
+        return list(root.iter_nodes()) if root else []
+
+    # return node object from DT
+    def get_node(self, root, attr):
+        ''' Parameters
+            ----------
+            self: Tree Node object
+            root: root node of tree
+            x: target node attr as string
+
+            Returns
+            -------
+            node: target node object as list
+        '''
+        node = []
+        if root and attr in root.index:
+            node.append(root.index[attr])
+        return node
+
+     # return the nested dict item
+    def __insert_dict(self, node):
+        ''' Parameters
+            ----------
+            self: Tree Node object
+            node: node to insert as node
+
+            Returns
+            -------
+            dict conaining node attr and value
+        '''
+        return {'attr': node.attr, 'value': node.value}
+
+    # convert DT to dict
+    def to_dict(self, node_list=None):
+        ''' Parameters
+            ----------
+            self: Tree Node object
+            node_list: unused, the whole tree below
+                       self is always converted
+
+            Returns
+            -------
+            cd: tree as dict
+        '''
+        cd = Chain_Dict()
+
+        # carry each node's parent dict and key
+        # down instead of searching for its path
+        stack = [(self, cd, 'tree_node')]
+        while stack:
+            node, parent, key = stack.pop()
+            d = parent[key] = self.__insert_dict(node)
+            if node.r_branch: stack.append((node.r_branch, d, 'r_child'))
+            if node.l_branch: stack.append((node.l_branch, d, 'l_child'))
+
+        return cd
\ No newline at end of file
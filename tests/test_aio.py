@@ -0,0 +1,71 @@
+import asyncio
+import time
+from concurrent.futures import ProcessPoolExecutor
+import pytest
+import tana2tree as t2t
+from tana2tree.generator import make_attributes, write_report
+
+# p99 loop lag allowed while reports load off the loop
+MAX_LAG = 0.05
+
+@pytest.fixture(scope="module")
+def reports(tmp_path_factory):
+    tmp = tmp_path_factory.mktemp("reports")
+    attributes = make_attributes(150, style="mixed")
+    paths = []
+    for i in range(16):
+        paths.append(str(tmp / "report{0:02}.txt".format(i)))
+        write_report(paths[-1], 2000, attributes=attributes, seed=i)
+    return paths
+
+def run(coro):
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    try:
+        return loop.run_until_complete(coro)
+    finally:
+        asyncio.set_event_loop(None)
+        loop.close()
+
+async def measure_lag(stop, lags, interval=0.001):
+    # how late the loop wakes a sleeping task
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append(time.perf_counter() - start - interval)
+
+async def load_with_lag(paths, executor=None):
+    stop, lags = asyncio.Event(), []
+    ticker = asyncio.ensure_future(measure_lag(stop, lags))
+    parsers = await t2t.aparse_many(paths, 8, executor)
+    stop.set()
+    await ticker
+    lags.sort()
+    return parsers, lags[int(len(lags) * 0.99)]
+
+def test_same_trees(reports):
+    parsers = run(t2t.aparse_many(reports[:4]))
+    for path, parser in zip(reports, parsers):
+        expected = t2t.Tanagra_Parser()
+        expected.parse(path)
+        assert parser.to_table() == expected.to_table()
+
+@pytest.mark.parametrize("pool", [False, True])
+def test_loop_lag(reports, pool):
+    if pool:
+        with ProcessPoolExecutor(2) as executor:
+            parsers, p99 = run(load_with_lag(reports, executor))
+    else:
+        parsers, p99 = run(load_with_lag(reports))
+    assert len(parsers) == len(reports)
+    assert p99 < MAX_LAG, "loads stall the loop"
+
+def test_timeout(reports):
+    with pytest.raises(asyncio.TimeoutError):
+        run(t2t.aparse(reports[0], timeout=0))
+
+def test_errors_returned(reports, tmp_path):
+    missing = str(tmp_path / "missing.txt")
+    parsers = run(t2t.aparse_many([reports[0], missing], return_exceptions=True))
+    assert isinstance(parsers[0], t2t.Tanagra_Parser)
+    assert isinstance(parsers[1], OSError)
@@ -0,0 +1,77 @@
+import io
+import pytest
+import tana2tree as t2t
+import tana2tree.binary as bn
+import tana2tree.compact as c
+from tana2tree.generator import write_report
+
+def parsed(tmp_path, n_leaves, seed=0):
+    file_name = str(tmp_path / "report.txt")
+    write_report(file_name, n_leaves, style="mixed", seed=seed)
+    parser = t2t.Tanagra_Parser()
+    parser.parse(file_name)
+    return parser
+
+# labels whose tails look like postfixes but
+# do not join back the same way
+LABELS = ["ccm", "ccm_2", "ccm_02", "ccm_0", "_3", "ccm_1234567890", "ccm_\u0663", "größe_7", "a_b_12"]
+
+def label_table():
+    n = len(LABELS)
+    left = [i + 1 if i + 1 < n else -1 for i in range(n)]
+    ops = ["<"] * (n - 1) + [None]
+    values = [float(i) for i in range(n - 1)] + [None]
+    orig = {a: c.split_label(a)[0] + "!" for a in LABELS}
+    return (LABELS, ops, values, left, [-1] * n, orig, [10] * (n - 1) + [None], [0.5] * (n - 1) + [None])
+
+@pytest.mark.parametrize("use_mmap", [True, False])
+def test_save_load(tmp_path, use_mmap):
+    parser = parsed(tmp_path, 500)
+    file_name = str(tmp_path / "tree.t2tb")
+    parser.save(file_name)
+
+    loaded = t2t.Tanagra_Parser()
+    loaded.load(file_name, use_mmap)
+    assert loaded.to_table() == parser.to_table()
+    assert dict(loaded.orig_labels) == parser.orig_labels
+    for node in parser.traverse():
+        assert loaded.get_node(node.attr)[0].value == node.value
+    loaded.close()
+
+def test_labels(tmp_path):
+    table = label_table()
+    file_name = str(tmp_path / "labels.t2tb")
+    bn.write(file_name, table)
+    tree, orig_labels = bn.read(file_name)
+    with tree:
+        assert tree.to_table() == table
+        assert [orig_labels[a] for a in LABELS] == [table[5][a] for a in LABELS]
+        assert tree.find("ccm_3") == -1
+
+def test_dump_loads():
+    table = label_table()
+    out = io.BytesIO()
+    bn.dump(table, out)
+    tree, _ = bn.loads(out.getvalue())
+    with tree:
+        assert tree.to_table() == table
+
+def test_compact_matches_binary(tmp_path):
+    parser = parsed(tmp_path, 300, seed=4)
+    table = parser.to_table()
+    out = io.BytesIO()
+    bn.dump(table, out)
+    tree, _ = bn.loads(out.getvalue())
+    with tree:
+        assert tree.to_table() == c.Compact_Tree(table).to_table() == table
+
+def test_rejects_bad_files(tmp_path):
+    out = io.BytesIO()
+    bn.dump(label_table(), out)
+    data = out.getvalue()
+    with pytest.raises(ValueError, match="truncated"):
+        bn.loads(data[:len(data) - 4])
+    with pytest.raises(ValueError, match="not a tana2tree"):
+        bn.loads(b"XXXX" + data[4:])
+    with pytest.raises(ValueError, match="format version"):
+        bn.loads(data[:4] + b"\x00\x00" + data[6:])
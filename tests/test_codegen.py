@@ -0,0 +1,63 @@
+import random
+import pytest
+import tana2tree as t2t
+from tana2tree.generator import write_report
+
+def walk(parser, features, x):
+    # class of one row by following the node links
+    node = parser.root
+    while node.op:
+        value = x[features.index(parser.orig_labels[node.attr])]
+        node = node.l_branch if value < node.value else node.r_branch
+    return parser.orig_labels[node.attr]
+
+def random_rows(parser, features, n, seed):
+    # values around and exactly at the thresholds
+    rng = random.Random(seed)
+    thresholds = [node.value for node in parser.traverse() if node.op]
+    low, high = min(thresholds) - 1, max(thresholds) + 1
+    for _ in range(n):
+        yield [rng.choice(thresholds) if rng.random() < 0.3 else rng.uniform(low, high) for _ in features]
+
+@pytest.mark.parametrize("seed", range(5))
+def test_function_matches_walk(tmp_path, seed):
+    file_name = str(tmp_path / "report.txt")
+    write_report(file_name, 200, style="mixed", seed=seed)
+    parser = t2t.Tanagra_Parser()
+    parser.parse(file_name)
+    features = parser.get_features()
+    random.Random(seed).shuffle(features)
+
+    predict = parser.to_function(features)
+    assert predict.features == features
+    for x in random_rows(parser, features, 500, seed):
+        assert predict(x) == walk(parser, features, x)
+
+def test_profiled_function(tmp_path):
+    file_name = str(tmp_path / "report.txt")
+    write_report(file_name, 50, seed=1)
+    profiler = t2t.Profiler()
+    parser = t2t.Tanagra_Parser(profiler=profiler)
+    parser.parse(file_name)
+    features = parser.get_features()
+
+    predict = parser.to_function()
+    rows = list(random_rows(parser, features, 100, 1))
+    assert [predict(x) for x in rows] == [walk(parser, features, x) for x in rows]
+    stage = profiler.as_dict()["score"]
+    assert stage["rows"] == 100 and stage["visits"] >= 100
+
+def test_write_module(tmp_path):
+    file_name = str(tmp_path / "report.txt")
+    write_report(file_name, 100, seed=2)
+    parser = t2t.Tanagra_Parser()
+    parser.parse(file_name)
+    module = str(tmp_path / "scorer.py")
+    parser.write_module(module)
+
+    scope = {}
+    with open(module) as file_in:
+        exec(compile(file_in.read(), module, "exec"), scope)
+    features = list(scope["FEATURES"])
+    for x in random_rows(parser, features, 200, 2):
+        assert scope["predict"](x) == walk(parser, features, x)